@@ -0,0 +1,114 @@
+"""
+Benchmarks of generating user activity, simulating it and reporting on the
+simulation, for scenarios from a hundred users on a couple of nodes for a day
+to twenty thousand users on hundreds of nodes for a month. Run them with
+pytest-benchmark:
+
+    pytest benchmarks/bench_simulation.py
+
+Every benchmark records its wall time and its peak memory as measured by
+tracemalloc, and they are compared to benchmarks/baseline.json, which was
+recorded on a single machine. Results more than --tolerance (25%) above the
+baseline are reported as regressions and fail the run. Save a baseline of your
+own machine before changing the code with --save-baseline, and select
+scenarios with -k, for example -k "not month".
+"""
+
+import numpy as np
+import pytest
+
+from z2jh_cost_simulator.generate_user_activity import generate_user_activity
+from z2jh_cost_simulator.kernel import compiled_tick_kernel
+from z2jh_cost_simulator.simulator import Simulation
+
+# The fraction of the users that is active in every hour of a day.
+DAILY_PROFILE = np.array(
+    [0.05, 0.03, 0.02, 0.02, 0.02, 0.03, 0.1, 0.3, 0.6, 0.9, 1.0, 0.9]
+    + [0.7, 0.8, 0.9, 0.9, 0.8, 0.6, 0.4, 0.3, 0.25, 0.2, 0.15, 0.1]
+)
+
+# name: (users, days, max_nodes, pod_inactivity_time, pod_max_lifetime)
+SCENARIOS = {
+    "100users-2nodes-day": (100, 1, 2, 60, 0),
+    "1000users-50nodes-week": (1000, 7, 50, 60, 0),
+    "1000users-50nodes-week-strict-culling": (1000, 7, 50, 10, 240),
+    "5000users-200nodes-week": (5000, 7, 200, 60, 480),
+    "20000users-500nodes-month": (20000, 30, 500, 60, 480),
+}
+
+
+def simultaneous_user_count(name):
+    users, days = SCENARIOS[name][:2]
+    return np.round(users * np.tile(DAILY_PROFILE, days)).astype(int).tolist()
+
+
+def configurations(name):
+    users, days, max_nodes, pod_inactivity_time, pod_max_lifetime = SCENARIOS[name]
+    return {
+        "min_nodes": 1,
+        "max_nodes": max_nodes,
+        "node_memory": 52,
+        "user_pod_memory": 1,
+        "cost_per_month": 150,
+        "pod_inactivity_time": pod_inactivity_time,
+        "pod_max_lifetime": pod_max_lifetime,
+        "node_stop_time": 10,
+    }
+
+
+_user_activity = {}
+
+
+def user_activity(name):
+    if name not in _user_activity:
+        _user_activity.clear()
+        _user_activity[name] = generate_user_activity(
+            simultaneous_user_count(name), seed=0, intervals=True
+        )
+    return _user_activity[name]
+
+
+def simulation(name, run=True):
+    sim = Simulation(configurations(name), user_activity(name))
+    if run:
+        sim.run(engine="event")
+    return sim
+
+
+scenarios = pytest.mark.parametrize("scenario", list(SCENARIOS))
+
+
+@scenarios
+def test_generate_user_activity(measure, scenario):
+    counts = simultaneous_user_count(scenario)
+    measure(lambda: generate_user_activity(counts, seed=0, intervals=True))
+
+
+@scenarios
+@pytest.mark.parametrize("engine", ["event", "tick", "numba"])
+def test_run(measure, scenario, engine):
+    if engine == "tick" and SCENARIOS[scenario][0] > 1000:
+        pytest.skip("The tick engine is only benchmarked with few users.")
+    if engine == "numba" and compiled_tick_kernel is None:
+        pytest.skip("numba isn't installed.")
+    backend = "numba" if engine == "numba" else "python"
+    engine = "tick" if engine == "numba" else engine
+    measure(
+        lambda sim: sim.run(engine=engine, backend=backend),
+        setup=lambda: simulation(scenario, run=False),
+        rounds=1,
+        # The first run loads the compiled kernel.
+        warmup_rounds=1 if backend == "numba" else 0,
+    )
+
+
+@scenarios
+def test_create_utilization_data(measure, scenario):
+    sim = simulation(scenario)
+    measure(sim.create_utilization_data)
+
+
+@scenarios
+def test_calculate_cost(measure, scenario):
+    sim = simulation(scenario)
+    measure(sim.calculate_cost)
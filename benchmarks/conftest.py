@@ -0,0 +1,129 @@
+"""
+Records the wall time and peak memory of the benchmarks, and compares them to a
+stored baseline, see bench_simulation.py.
+"""
+
+import json
+import os
+import tracemalloc
+
+import pytest
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Differences in time smaller than this many seconds aren't regressions, as the
+# time of the fastest benchmarks varies by more than the tolerance between runs.
+TIME_RESOLUTION = 0.005
+
+# The results of the benchmarks of this session, by name.
+_results = {}
+_report = []
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("z2jh benchmarks")
+    group.addoption(
+        "--baseline",
+        default=DEFAULT_BASELINE,
+        help="The JSON file with the baseline results of the benchmarks.",
+    )
+    group.addoption(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results of the benchmarks as the baseline.",
+    )
+    group.addoption(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="The fraction a result may exceed the baseline before it is a regression.",
+    )
+
+
+@pytest.fixture
+def measure(benchmark, request):
+    """
+    Returns a function that benchmarks a function, and then measures its peak
+    memory with tracemalloc in one more call. A 'setup' function can provide a
+    fresh argument for every call, which isn't part of the measurements.
+    """
+
+    def measure(function, setup=None, rounds=3, warmup_rounds=0):
+        def arguments():
+            return ((setup(),) if setup else ()), {}
+
+        result = benchmark.pedantic(
+            function,
+            setup=arguments,
+            rounds=rounds,
+            warmup_rounds=warmup_rounds,
+            iterations=1,
+        )
+
+        args, kwargs = arguments()
+        tracemalloc.start()
+        try:
+            function(*args, **kwargs)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_memory"] = peak_memory
+        if benchmark.stats is not None:
+            _results[request.node.name] = {
+                "time": benchmark.stats.stats.min,
+                "peak_memory": peak_memory,
+            }
+        return result
+
+    return measure
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session):
+    if not _results:
+        return
+    config = session.config
+    path = config.getoption("--baseline")
+    baseline = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            baseline = json.load(f)
+
+    if config.getoption("--save-baseline"):
+        baseline.update(_results)
+        with open(path, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        _report.append("Saved the results of the benchmarks to {}".format(path))
+        return
+
+    tolerance = config.getoption("--tolerance")
+    regressions = 0
+    for name, result in sorted(_results.items()):
+        if name not in baseline:
+            continue
+        for key in ["time", "peak_memory"]:
+            ratio = result[key] / baseline[name][key] if baseline[name][key] else 1
+            if key == "time" and result[key] - baseline[name][key] < TIME_RESOLUTION:
+                continue
+            if ratio > 1 + tolerance:
+                regressions += 1
+                _report.append(
+                    "REGRESSION {} {}: {:.3g} vs {:.3g} in the baseline ({:+.0%})".format(
+                        name, key, result[key], baseline[name][key], ratio - 1
+                    )
+                )
+    _report.append(
+        "{} of {} benchmarks compared to {}, {} regressions".format(
+            len(set(_results) & set(baseline)), len(_results), path, regressions
+        )
+    )
+    if regressions:
+        session.exitstatus = 1
+
+
+def pytest_terminal_summary(terminalreporter):
+    if _report:
+        terminalreporter.section("benchmark baseline")
+        for line in _report:
+            terminalreporter.write_line(line)
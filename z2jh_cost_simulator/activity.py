@@ -0,0 +1,210 @@
+import numpy as np
+
+
+def as_activity(user_activity):
+    """
+    Returns the activity of the users as ActivityIntervals if it is given as such,
+    and otherwise as a matrix, see as_activity_matrix.
+    """
+    if isinstance(user_activity, ActivityIntervals):
+        return user_activity
+    return as_activity_matrix(user_activity)
+
+
+def as_activity_matrix(user_activity):
+    """
+    Returns the activity of the users as a (users x minutes) uint8 matrix of 0's
+    and 1's, which is how the simulator stores it. Takes a list with the activity
+    of each user, like generate_user_activity returns, or a 2-D array. A uint8
+    matrix of 0's and 1's is used as it is, without a copy, and like other
+    arrays, a user is active in the minutes that aren't 0.
+    """
+    if isinstance(user_activity, np.ndarray):
+        if user_activity.ndim != 2:
+            raise ValueError("The user activity must be a (users x minutes) matrix.")
+        if user_activity.dtype == np.uint8 and np.max(user_activity, initial=0) <= 1:
+            return user_activity
+        return (user_activity != 0).view(np.uint8)
+
+    matrix = np.empty((len(user_activity), len(user_activity[0])), dtype=np.uint8)
+    for index, activity in enumerate(user_activity):
+        matrix[index] = np.asarray(activity) != 0
+    return matrix
+
+
+def activity_runs(activity):
+    """
+    Returns the start and (exclusive) end minute of each period of activity, as
+    two sorted arrays. These are computed once per user, and let the simulator
+    look up when a user is next active or has been inactive for long enough
+    instead of scanning the activity minute by minute.
+    """
+    active = np.concatenate(([False], np.asarray(activity) != 0, [False]))
+    edges = np.flatnonzero(active[1:] != active[:-1])
+    return edges[::2], edges[1::2]
+
+
+def next_active_minute(starts, ends, time):
+    """Returns the first active minute from 'time' and onwards, or None."""
+    index = np.searchsorted(ends, time, side="right")
+    if index == len(starts):
+        return None
+    return max(int(starts[index]), time)
+
+
+def next_idle_deadline(starts, ends, time, window):
+    """
+    Returns the first minute from 'time' and onwards where the user has been
+    inactive for the last 'window' + 1 minutes, which is when the pod culler
+    culls the user's pod for inactivity.
+    """
+    index = np.searchsorted(starts, time, side="right")
+    deadline = max(time, window)
+    if index > 0:
+        deadline = max(deadline, int(ends[index - 1]) + window)
+    while index < len(starts) and starts[index] <= deadline:
+        deadline = max(deadline, int(ends[index]) + window)
+        index += 1
+    return deadline
+
+
+class ActivityIntervals:
+    """
+    The activity of users as the periods where they are active, which takes far
+    less memory than a (users x minutes) matrix for users who are inactive most
+    of the time. Simulation takes it in place of an activity matrix.
+
+    The periods are stored in a compressed sparse row layout: the start and
+    (exclusive) end minutes of the periods of all users are two flat arrays,
+    where the periods of user i are at offsets[i]:offsets[i + 1]. The periods of
+    a user are sorted and neither overlap nor touch, like activity_runs.
+    """
+
+    def __init__(self, offsets, starts, ends, length):
+        """
+        offsets - where the periods of every user start, and the number of periods.
+        starts  - the first minute of every period.
+        ends    - the minute after the last minute of every period.
+        length  - the number of minutes of the activity.
+        """
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self.length = length
+        # The user of every period, and the periods ordered by their start and
+        # by their end, which are only needed to follow the activity minute by
+        # minute.
+        self._users = None
+        self._by_start = None
+        self._by_end = None
+        self._sorted_starts = None
+        self._sorted_ends = None
+
+    @classmethod
+    def from_matrix(cls, user_activity, scale=1):
+        """
+        Returns the periods of activity of a (users x minutes) activity matrix.
+
+        scale - the number of minutes of a column of the matrix, for example 60
+                for a (users x hours) matrix.
+        """
+        matrix = as_activity_matrix(user_activity)
+        user_count, length = matrix.shape
+        padded = np.zeros((user_count, length + 2), dtype=np.int8)
+        padded[:, 1:-1] = matrix
+        # The edges of the periods, sorted by user and then by minute.
+        users, edges = np.nonzero(np.diff(padded, axis=1))
+        offsets = np.zeros(user_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(users[::2], minlength=user_count), out=offsets[1:])
+        return cls(offsets, edges[::2] * scale, edges[1::2] * scale, length * scale)
+
+    @classmethod
+    def from_sessions(cls, sessions, length):
+        """
+        Returns the periods of activity of a list with the (start, end) minutes
+        of the sessions of every user. Sessions may overlap and are cut to the
+        'length' minutes of the activity.
+        """
+        counts = [len(user_sessions) for user_sessions in sessions]
+        users = np.repeat(np.arange(len(sessions)), counts)
+        periods = np.array(
+            [session for user_sessions in sessions for session in user_sessions],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        periods = np.clip(periods, 0, length)
+        keep = periods[:, 0] < periods[:, 1]
+        users, periods = users[keep], periods[keep]
+        order = np.lexsort((periods[:, 0], users))
+        users, starts, ends = users[order], periods[order, 0], periods[order, 1]
+
+        # A session starts a new period unless it overlaps or touches one of the
+        # earlier sessions of the user, whose latest end is found by offsetting
+        # the ends of every user past the ones of the users before.
+        offset_ends = ends + users * (length + 1)
+        latest_ends = np.maximum.accumulate(offset_ends)
+        new_period = np.ones(len(users), dtype=bool)
+        new_period[1:] = (users[1:] != users[:-1]) | (
+            starts[1:] + users[1:] * (length + 1) > latest_ends[:-1]
+        )
+        first = np.flatnonzero(new_period)
+        offsets = np.zeros(len(sessions) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(users[first], minlength=len(sessions)), out=offsets[1:])
+        if len(first) == 0:
+            return cls(offsets, [], [], length)
+        return cls(offsets, starts[first], np.maximum.reduceat(ends, first), length)
+
+    @property
+    def shape(self):
+        return (len(self), self.length)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        """Returns the activity of a user as a row of an activity matrix."""
+        activity = np.zeros(self.length, dtype=np.uint8)
+        for start, end in zip(*self.runs(index)):
+            activity[start:end] = 1
+        return activity
+
+    def runs(self, index):
+        """Returns the start and (exclusive) end minute of the periods of a user."""
+        return (
+            self.starts[self.offsets[index] : self.offsets[index + 1]],
+            self.ends[self.offsets[index] : self.offsets[index + 1]],
+        )
+
+    def to_matrix(self):
+        """Returns the activity as a (users x minutes) uint8 activity matrix."""
+        self._index()
+        changes = np.zeros((len(self), self.length + 1), dtype=np.int8)
+        changes[self._users, self.starts] = 1
+        changes[self._users, self.ends] = -1
+        return np.cumsum(changes[:, :-1], axis=1, dtype=np.int8).view(np.uint8)
+
+    def active_users(self, time):
+        """Returns a boolean array of which users are active at the given minute."""
+        self._index()
+        active = np.zeros(len(self), dtype=bool)
+        active[self._users[(self.starts <= time) & (time < self.ends)]] = True
+        return active
+
+    def changes(self, time):
+        """
+        Returns the users who become active at the given minute, and the users
+        who become inactive.
+        """
+        self._index()
+        first, last = np.searchsorted(self._sorted_starts, [time, time + 1])
+        starting = self._users[self._by_start[first:last]]
+        first, last = np.searchsorted(self._sorted_ends, [time, time + 1])
+        ending = self._users[self._by_end[first:last]]
+        return starting, ending
+
+    def _index(self):
+        if self._users is None:
+            self._users = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+            self._by_start = np.argsort(self.starts, kind="stable")
+            self._by_end = np.argsort(self.ends, kind="stable")
+            self._sorted_starts = self.starts[self._by_start]
+            self._sorted_ends = self.ends[self._by_end]
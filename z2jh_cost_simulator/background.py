@@ -0,0 +1,144 @@
+import concurrent.futures
+import threading
+
+from .generate_user_activity import generate_user_activity
+from .simulator import NodeState, Simulation, time_settings
+
+
+class BackgroundSimulation:
+    """
+    Simulates the cost of an hourly number of users in a background thread, so an
+    input form can ask for it on every change without waiting for it.
+
+    Changes asked for within 'delay' seconds of each other are simulated once,
+    with the last of them, and a simulation that is still running when a newer
+    one is asked for is abandoned. While a simulation runs, 'callback' is called
+    from the background thread after every 'chunk_minutes' minutes with a dict of:
+
+    "minute"     - the number of minutes simulated so far.
+    "minutes"    - the number of minutes of the simulation.
+    "cost"       - the cost of the minutes simulated so far.
+    "done"       - if all minutes have been simulated, and "cost" is the total.
+    "simulation" - the Simulation, which has been run to "minute".
+    """
+
+    def __init__(
+        self,
+        configurations,
+        callback,
+        delay=0.3,
+        chunk_minutes=1440,
+        engine="event",
+        seed=0,
+        error_callback=None,
+    ):
+        """
+        configurations - the configurations of the Simulation.
+        engine         - the engine of Simulation.run.
+        seed           - the seed of generate_user_activity, so the cost only
+                         changes when the number of users does.
+        error_callback - called from the background thread with the exception a
+                         simulation failed with, which wait raises as well.
+        """
+        self.configurations = configurations
+        self.callback = callback
+        self.error_callback = error_callback
+        self.delay = delay
+        self.chunk_minutes = chunk_minutes
+        self.engine = engine
+        self.seed = seed
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+        # Increased for every change, which makes older simulations stale.
+        self._generation = 0
+        self._timer = None
+        self._future = None
+
+    def submit(self, hourly_users):
+        """
+        Simulates the hourly number of users, like generate_user_activity takes
+        them, once no other change has been submitted for 'delay' seconds.
+        """
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(
+                self.delay, self._start, (self._generation, list(hourly_users))
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self):
+        """Abandons the simulations that have been submitted."""
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+
+    def wait(self, timeout=None):
+        """
+        Waits for the last submitted simulation to finish or be abandoned, and
+        raises the exception it failed with, if any.
+        """
+        with self._lock:
+            timer = self._timer
+        if timer is not None:
+            timer.join(timeout)
+        with self._lock:
+            future = self._future
+        if future is not None:
+            future.result(timeout)
+
+    def shutdown(self):
+        """Abandons the submitted simulations and stops the background thread."""
+        self.cancel()
+        self._executor.shutdown(wait=True)
+
+    def _start(self, generation, hourly_users):
+        with self._lock:
+            if generation == self._generation:
+                self._future = self._executor.submit(
+                    self._simulate, generation, hourly_users
+                )
+
+    def _stale(self, generation):
+        with self._lock:
+            return generation != self._generation
+
+    def _simulate(self, generation, hourly_users):
+        try:
+            self._run(generation, hourly_users)
+        except Exception as error:
+            if self.error_callback is not None:
+                self.error_callback(error)
+            raise
+
+    def _run(self, generation, hourly_users):
+        if self._stale(generation):
+            return
+        tick_minutes = time_settings(self.configurations)["tick_minutes"]
+        user_activity = generate_user_activity(
+            hourly_users, seed=self.seed, tick_minutes=tick_minutes
+        )
+        simulation = Simulation(self.configurations, user_activity)
+        ticks = simulation.simulation_time
+        chunk_ticks = max(self.chunk_minutes // tick_minutes, 1)
+        cost_per_tick = self.configurations["cost_per_month"] / 720 * tick_minutes / 60
+
+        stop = 0
+        while stop < ticks:
+            if self._stale(generation):
+                return
+            stop = min(stop + chunk_ticks, ticks)
+            simulation.run(stop, engine=self.engine)
+            billed = simulation.node_states()[:, :stop] != NodeState.Stopped
+            self.callback(
+                {
+                    "minute": stop * tick_minutes,
+                    "minutes": ticks * tick_minutes,
+                    "cost": billed.sum() * cost_per_tick,
+                    "done": stop == ticks,
+                    "simulation": simulation,
+                }
+            )
@@ -0,0 +1,293 @@
+"""
+Runs many simulations of the same user activity together, minute by minute, with
+the state of all of them stacked into arrays, so every step of a minute is done
+for all configurations at once.
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+from .activity import ActivityIntervals, as_activity
+from .cache import activity_fingerprint
+from .simulator import NodeState, Simulation, time_settings
+
+
+def simulate_batch(configurations, user_activity, scheduler=None, stop=0):
+    """
+    Returns a Simulation for every configuration of a list, which have been run
+    together with run_batch.
+
+    scheduler - the Scheduler of the simulations, which every simulation gets a
+                copy of, by default a MostUtilizedScheduler.
+    """
+    user_activity = as_activity(user_activity)
+    simulations = [
+        Simulation(
+            configuration,
+            user_activity,
+            scheduler=copy.copy(scheduler) if scheduler is not None else None,
+        )
+        for configuration in configurations
+    ]
+    run_batch(simulations, stop)
+    return simulations
+
+
+def run_batch(simulations, stop=0):
+    """
+    Runs a list of simulations of the same user activity from their start time to
+    'stop', like Simulation.run does for each of them, and with the same result.
+
+    The simulations are advanced in lockstep. Every minute, the pods of all of
+    them are created, scheduled and culled, and their nodes started and stopped,
+    with array operations over (simulations x users) and (simulations x nodes)
+    arrays, which is faster than running them one by one when there are several.
+    Simulations with a scheduler other than the MostUtilizedScheduler and
+    LeastUtilizedScheduler are run one by one.
+    """
+    fingerprint = None
+    for simulation in simulations:
+        activity = simulation.user_activity
+        if activity is not simulations[0].user_activity:
+            # Activity that isn't the same object is compared by its content.
+            if fingerprint is None:
+                fingerprint = activity_fingerprint(simulations[0].user_activity)
+            if activity_fingerprint(activity) != fingerprint:
+                raise ValueError(
+                    "The simulations of a batch must have the same activity."
+                )
+        if simulation.start_time != simulations[0].start_time:
+            raise ValueError("The simulations of a batch must have the same start.")
+
+    groups = {}
+    for simulation in simulations:
+        most_utilized = simulation._kernel_policy()
+        if most_utilized is None:
+            simulation.run(stop)
+        else:
+            groups.setdefault(most_utilized, []).append(simulation)
+
+    for most_utilized, group in groups.items():
+        group_stop = stop or group[0].simulation_time
+        for simulation in group:
+            if len(simulation.user_pool) == 0:
+                simulation._add_users()
+            if len(simulation.node_pool) == 0:
+                simulation._add_nodes()
+        if group[0].start_time < group_stop:
+            _run_lockstep(group, group_stop, most_utilized)
+        for simulation in group:
+            simulation.start_time = group_stop
+
+
+def run_batch_summary(configurations, user_activity, scheduler=None):
+    """
+    Returns the settings and the numbers of Simulation.summary of every
+    configuration of a list as a DataFrame with a row per configuration, like
+    sweep.run_sweep, with the configurations simulated by simulate_batch.
+    """
+    results = []
+    simulations = simulate_batch(configurations, user_activity, scheduler)
+    for index, simulation in enumerate(simulations):
+        result = {"configuration": index}
+        result.update(simulation.configurations)
+        result.update(simulation.summary())
+        results.append(result)
+    return pd.DataFrame(results)
+
+
+def _run_lockstep(simulations, stop, most_utilized):
+    start = simulations[0].start_time
+    activity = simulations[0].user_activity
+    if isinstance(activity, ActivityIntervals):
+        activity = activity.to_matrix()
+    # The active users of every minute.
+    columns = np.ascontiguousarray(activity[:, start:stop].T != 0)
+
+    states = [simulation._kernel_state() for simulation in simulations]
+    sizes = [len(simulation.node_pool) for simulation in simulations]
+    count = len(simulations)
+    node_count = max(sizes)
+
+    # Simulations with fewer nodes are padded with nodes without capacity, which
+    # never get a pod and are never started.
+    def stack(name, fill, dtype):
+        stacked = np.full((count, node_count), fill, dtype=dtype)
+        for index, state in enumerate(states):
+            stacked[index, : sizes[index]] = state[name]
+        return stacked
+
+    capacity = stack("capacity", 0, np.int64)
+    node_state = stack("node_state", NodeState.Stopped, np.int8)
+    running_from = stack("running_from", stop, np.int64)
+    utilization = stack("utilization", 0, np.int64)
+    constant_since = stack("constant_since", 0, np.int64)
+    previous_utilization = utilization.copy()
+    # The activity is the same, and so is the last minute users were active.
+    last_active = states[0]["last_active"]
+
+    has_pod = np.stack([simulation.user_pool.has_pod for simulation in simulations])
+    pod_node = np.stack([simulation.user_pool.pod_node for simulation in simulations])
+    pod_start_time = np.stack(
+        [simulation.user_pool.pod_start_time for simulation in simulations]
+    )
+
+    settings = [time_settings(simulation.configurations) for simulation in simulations]
+
+    def setting(name):
+        return np.array([values[name] for values in settings], dtype=np.int64)
+
+    min_nodes = np.array(
+        [simulation.configurations["min_nodes"] for simulation in simulations],
+        dtype=np.int64,
+    )
+    node_stop_time = setting("node_stop_time")
+    node_start_time = setting("node_start_time")
+    # Culling settings of 0 turn culling off, which a setting past the end of
+    # the simulation does as well.
+    inactivity_time = setting("pod_inactivity_time")
+    inactivity_time[inactivity_time <= 0] = stop + 1
+    max_lifetime = setting("pod_max_lifetime")
+    max_lifetime[max_lifetime <= 0] = stop + 1
+
+    node_states = np.empty((stop - start, count, node_count), dtype=np.int8)
+    node_utilization = np.empty((stop - start, count, node_count), dtype=np.int64)
+
+    for t in range(start, stop):
+        # Nodes finishing their start or stop
+        if t > start:
+            node_state[(node_state == NodeState.Starting) & (running_from <= t)] = (
+                NodeState.Running
+            )
+            node_state[node_state == NodeState.Stopping] = NodeState.Stopped
+
+        # Create user pods for active users without a pod
+        active = np.flatnonzero(columns[t - start])
+        if len(active):
+            last_active[active] = t
+            has_pod[:, active] = True
+
+        # Scheduler
+        pending = has_pod & (pod_node < 0)
+        if node_count and pending.any():
+            schedule = _schedule_most_utilized if most_utilized else _schedule_least
+            pods, users, nodes = schedule(pending, capacity, utilization)
+            pod_node[pods, users] = nodes
+            pod_start_time[pods, users] = t
+            utilization += np.bincount(
+                pods * node_count + nodes, minlength=count * node_count
+            ).reshape(count, node_count)
+
+        # Cluster Autoscaler (CA): start nodes
+        starting = (node_state == NodeState.Stopped) & (utilization > 0)
+        if starting.any():
+            node_state[starting] = NodeState.Starting
+            running_from[starting] = t + node_start_time[np.nonzero(starting)[0]]
+            # Nodes without a start time are running right away.
+            node_state[starting & (running_from <= t)] = NodeState.Running
+
+        # Cluster Autoscaler (CA): stop nodes idle for node_stop_time, in order,
+        # while more than min_nodes nodes are running.
+        running = node_state == NodeState.Running
+        since = np.where(utilization != previous_utilization, t, constant_since)
+        idle = (
+            running
+            & (utilization == 0)
+            & (since <= t - node_stop_time[:, np.newaxis])
+            & (t >= node_stop_time[:, np.newaxis])
+        )
+        if idle.any():
+            allowed = np.sum(running, axis=1) - min_nodes
+            node_state[idle & (np.cumsum(idle, axis=1) <= allowed[:, np.newaxis])] = (
+                NodeState.Stopping
+            )
+
+        # Pod Culler: cull for inactivity or max lifetime
+        cull = (pod_node >= 0) & (
+            (last_active < (t - inactivity_time)[:, np.newaxis])
+            | (pod_start_time <= (t - max_lifetime)[:, np.newaxis])
+        )
+        if cull.any():
+            pods, users = np.nonzero(cull)
+            utilization -= np.bincount(
+                pods * node_count + pod_node[pods, users], minlength=count * node_count
+            ).reshape(count, node_count)
+            has_pod[pods, users] = False
+            pod_node[pods, users] = -1
+            pod_start_time[pods, users] = 0
+
+        node_states[t - start] = node_state
+        node_utilization[t - start] = utilization
+        changed = utilization != previous_utilization
+        constant_since[changed] = t
+        previous_utilization[changed] = utilization[changed]
+
+    for index, simulation in enumerate(simulations):
+        size = sizes[index]
+        user_pool = simulation.user_pool
+        user_pool.has_pod[:] = has_pod[index]
+        user_pool.pod_node[:] = pod_node[index]
+        user_pool.pod_start_time[:] = pod_start_time[index]
+        state = {
+            "node_state": node_state[index, :size],
+            "running_from": running_from[index, :size],
+            "utilization": utilization[index, :size],
+        }
+        simulation._store_kernel_state(
+            stop,
+            state,
+            node_states[:, index, :size].T,
+            node_utilization[:, index, :size].T,
+        )
+
+
+def _schedule_most_utilized(pending, capacity, utilization):
+    # Placing pods in order on the most utilized node with room fills that node
+    # before the next most utilized one, so the pods of every simulation go to
+    # its nodes by utilization, the first one on ties, up to their free room.
+    count, node_count = utilization.shape
+    order = np.argsort(-utilization, axis=1, kind="stable")
+    room = np.cumsum(np.take_along_axis(capacity - utilization, order, 1), axis=1)
+
+    pods, users = np.nonzero(pending)
+    firsts = np.cumsum(np.bincount(pods, minlength=count)) - np.bincount(
+        pods, minlength=count
+    )
+    ranks = np.arange(len(pods)) - firsts[pods]
+    placed = ranks < room[pods, -1]
+    pods, users, ranks = pods[placed], users[placed], ranks[placed]
+
+    # The position of the node of every pod in the order, searching the rooms
+    # of all simulations at once by offsetting them per simulation.
+    offset = np.max(room[:, -1]) + 1
+    offsets = np.arange(count) * offset
+    positions = np.searchsorted(
+        (room + offsets[:, np.newaxis]).ravel(), ranks + offsets[pods], side="right"
+    )
+    return pods, users, order.ravel()[positions]
+
+
+def _schedule_least(pending, capacity, utilization):
+    # Placing a pod changes which node is the least utilized, so the pods are
+    # placed one at a time, the n-th pending pod of all simulations at once.
+    count, node_count = utilization.shape
+    utilization = utilization.copy()
+    pods, users = np.nonzero(pending)
+    firsts = np.cumsum(np.bincount(pods, minlength=count)) - np.bincount(
+        pods, minlength=count
+    )
+    ranks = np.arange(len(pods)) - firsts[pods]
+    nodes = np.full(len(pods), -1)
+    for rank in range(np.max(ranks, initial=-1) + 1):
+        selected = np.flatnonzero(ranks == rank)
+        selected_pods = pods[selected]
+        room = utilization[selected_pods] < capacity[selected_pods]
+        masked = np.where(room, utilization[selected_pods], np.iinfo(np.int64).max)
+        chosen = np.argmin(masked, axis=1)
+        placed = room.any(axis=1)
+        nodes[selected[placed]] = chosen[placed]
+        utilization[selected_pods[placed], chosen[placed]] += 1
+    placed = nodes >= 0
+    return pods[placed], users[placed], nodes[placed]
@@ -0,0 +1,180 @@
+import collections
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from .activity import ActivityIntervals, as_activity
+from .checkpoint import Checkpoint
+from .simulator import Simulation
+
+
+def activity_fingerprint(user_activity):
+    """
+    Returns a hex digest identifying the user activity. A matrix is hashed with
+    its minutes packed to bits, so hashing a week of activity for thousands of
+    users takes a fraction of a second. The same activity as ActivityIntervals
+    has a different fingerprint than as a matrix.
+    """
+    user_activity = as_activity(user_activity)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((type(user_activity).__name__, user_activity.shape)).encode())
+    if isinstance(user_activity, ActivityIntervals):
+        for array in (user_activity.offsets, user_activity.starts, user_activity.ends):
+            digest.update(np.ascontiguousarray(array, dtype=np.int64).data)
+    else:
+        digest.update(np.packbits(user_activity != 0, axis=-1).data)
+    return digest.hexdigest()
+
+
+def configuration_key(configurations, scheduler=None):
+    """
+    Returns a hex digest identifying the configurations and the type of the
+    scheduler, the other inputs that decide the result of a simulation.
+    """
+    scheduler_name = type(scheduler).__name__ if scheduler is not None else None
+    text = json.dumps([configurations, scheduler_name], sort_keys=True)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+class SimulationCache:
+    """
+    Memoizes simulations, so simulating configurations and user activity that
+    have been simulated before returns the result without running it again.
+
+    The results are kept as Checkpoints at the end of the simulation, in memory
+    for the most recently used ones and optionally as .npz files in a directory,
+    which outlive the process and can be shared between processes.
+
+    maxsize   - the number of results kept in memory.
+    directory - the directory of the results on disk, or None to only keep them
+                in memory.
+    max_bytes - the total size of the files in 'directory'. The least recently
+                used are deleted when the results grow larger, or None for no
+                limit.
+    """
+
+    def __init__(self, maxsize=128, directory=None, max_bytes=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._results = collections.OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def simulate(
+        self,
+        configurations,
+        user_activity,
+        scheduler=None,
+        fingerprint=None,
+        engine="event",
+        backend="python",
+    ):
+        """
+        Returns a Simulation of the configurations and user activity that has been
+        run, from the cache if it has been simulated before.
+
+        fingerprint - the activity_fingerprint of the user activity, to save
+                      hashing it again when simulating many configurations.
+        engine and backend - see Simulation.run. They don't change the result, so
+                             a result is reused whichever were used to get it.
+        """
+        if fingerprint is None:
+            fingerprint = activity_fingerprint(user_activity)
+        key = configuration_key(configurations, scheduler) + "-" + fingerprint
+
+        checkpoint = self._get(key)
+        simulation = Simulation(configurations, user_activity, scheduler=scheduler)
+        if checkpoint is not None:
+            self.hits += 1
+            simulation.restore(checkpoint)
+            return simulation
+
+        self.misses += 1
+        simulation.run(engine=engine, backend=backend)
+        self._put(key, simulation.checkpoint())
+        return simulation
+
+    def clear(self):
+        """Removes all results, from memory and from the directory."""
+        self._results.clear()
+        for path in self._files():
+            os.remove(path)
+
+    def __len__(self):
+        return len(self._results)
+
+    def _get(self, key):
+        if key in self._results:
+            self._results.move_to_end(key)
+            return self._results[key]
+        if self.directory is None:
+            return None
+
+        path = self._path(key)
+        try:
+            checkpoint = Checkpoint.load(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # Missing, or a file that is still being written.
+            return None
+        # Loading a file makes it the most recently used.
+        os.utime(path)
+        self._remember(key, checkpoint)
+        return checkpoint
+
+    def _put(self, key, checkpoint):
+        self._remember(key, checkpoint)
+        if self.directory is None:
+            return
+
+        # Write to a temporary file first, so other processes never load a
+        # partly written result.
+        path = self._path(key)
+        temporary = path + ".{}.tmp".format(os.getpid())
+        with open(temporary, "wb") as f:
+            checkpoint.save(f)
+        os.replace(temporary, path)
+        self._evict_files()
+
+    def _remember(self, key, checkpoint):
+        self._results[key] = checkpoint
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def _files(self):
+        if self.directory is None:
+            return []
+        return [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".npz")
+        ]
+
+    def _evict_files(self):
+        if self.max_bytes is None:
+            return
+        files = []
+        for path in self._files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+
+from .timeline import Timeline
+
+
+class Checkpoint:
+    """
+    The state of a Simulation at the minute it has been run to, see
+    Simulation.checkpoint. A simulation can be restored to it, or a fork of the
+    simulation started from it, to re-run the minutes after it without
+    re-running the minutes before.
+
+    A checkpoint holds copies of the pod arrays of the users and of the change
+    points of the node timelines, so it is small compared to the per-minute
+    arrays, and doesn't hold the user activity, which doesn't change.
+
+    start_time     - the minute the simulation continues from.
+    configurations - the configurations of the simulation.
+    has_pod, pod_node and pod_start_time - the pods of the users, see UserPool.
+    nodes          - a dict per node with its "capacity", its "started_state"
+                     and "utilized_capacity" timelines, and the indices of the
+                     users with a pod on it as "pods".
+    """
+
+    def __init__(
+        self, start_time, configurations, has_pod, pod_node, pod_start_time, nodes
+    ):
+        self.start_time = start_time
+        self.configurations = configurations
+        self.has_pod = has_pod
+        self.pod_node = pod_node
+        self.pod_start_time = pod_start_time
+        self.nodes = nodes
+
+    def save(self, path):
+        """
+        Writes the checkpoint to a compressed .npz file. The change points of the
+        timelines of all nodes are stored as flat arrays with offsets per node.
+        """
+        arrays = {
+            "start_time": self.start_time,
+            "configurations": json.dumps(self.configurations),
+            "has_pod": self.has_pod,
+            "pod_node": self.pod_node,
+            "pod_start_time": self.pod_start_time,
+            "capacity": [node["capacity"] for node in self.nodes],
+            "length": [node["started_state"].length for node in self.nodes],
+        }
+        for name, dtype in _TIMELINES:
+            timelines = [node[name] for node in self.nodes]
+            arrays[name + "_offsets"] = _offsets([t.times for t in timelines])
+            arrays[name + "_times"] = _flatten([t.times for t in timelines], np.int64)
+            arrays[name + "_values"] = _flatten([t.values for t in timelines], dtype)
+        arrays["pods_offsets"] = _offsets([node["pods"] for node in self.nodes])
+        arrays["pods"] = _flatten([node["pods"] for node in self.nodes], np.int64)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a checkpoint written by save."""
+        with np.load(path) as arrays:
+            nodes = []
+            for index, capacity in enumerate(arrays["capacity"].tolist()):
+                length = int(arrays["length"][index])
+                node = {"capacity": capacity}
+                for name, dtype in _TIMELINES:
+                    timeline = Timeline(length, dtype=dtype)
+                    timeline.times = _row(arrays, name + "_times", name, index)
+                    timeline.values = _row(arrays, name + "_values", name, index)
+                    node[name] = timeline
+                node["pods"] = np.array(_row(arrays, "pods", "pods", index))
+                nodes.append(node)
+            return cls(
+                int(arrays["start_time"]),
+                json.loads(str(arrays["configurations"])),
+                arrays["has_pod"],
+                arrays["pod_node"],
+                arrays["pod_start_time"],
+                nodes,
+            )
+
+
+# The timelines of a node and the dtype of their values.
+_TIMELINES = [("started_state", np.int8), ("utilized_capacity", np.float64)]
+
+
+def _offsets(rows):
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in rows], out=offsets[1:])
+    return offsets
+
+
+def _flatten(rows, dtype):
+    return np.concatenate(
+        [np.zeros(0, dtype=dtype)] + [np.asarray(row, dtype=dtype) for row in rows]
+    )
+
+
+def _row(arrays, name, offsets_name, index):
+    offsets = arrays[offsets_name + "_offsets"]
+    return arrays[name][offsets[index] : offsets[index + 1]].tolist()
@@ -0,0 +1,275 @@
+"""
+The z2jh-cost-simulator command, which simulates configurations with the user
+activity of files across worker processes, without a notebook, and writes the
+utilization and cost of every run to partitioned Parquet or Arrow files.
+"""
+
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from .generate_user_activity import generate_user_activity
+from .resolution import coarsen_activity
+from .simulator import Simulation, time_settings
+from .trace import open_trace
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# The file name extension of every output format. Parquet and Arrow (Feather)
+# files are written by pandas with pyarrow.
+_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+
+def read_configurations(path):
+    """
+    Returns the configurations of a JSON file, which has a configuration of a
+    Simulation or a list of them, as a list.
+    """
+    with open(path) as f:
+        configurations = json.load(f)
+    if isinstance(configurations, dict):
+        configurations = [configurations]
+    return configurations
+
+
+def read_activity(path, tick_minutes=1, seed=None):
+    """
+    Returns the user activity of a file for a Simulation with ticks of
+    'tick_minutes' minutes. The file is either a trace, see trace.write_trace,
+    with the activity per minute or per tick, or an hourly curve of the number
+    of simultaneous users, as a JSON list or as numbers separated by commas or
+    whitespace, which generate_user_activity turns into activity with 'seed'.
+    """
+    try:
+        trace = open_trace(path)
+    except ValueError:
+        return generate_user_activity(
+            _read_hourly_users(path), seed=seed, tick_minutes=tick_minutes
+        )
+    if trace.resolution == tick_minutes * 60:
+        return trace.activity()
+    if trace.resolution == 60:
+        return coarsen_activity(trace.activity(), tick_minutes)
+    raise ValueError(
+        "The trace {} has {} second time steps, not minutes or ticks of {} "
+        "minutes.".format(path, trace.resolution, tick_minutes)
+    )
+
+
+def utilization_table(simulation):
+    """
+    Returns the utilization of the nodes of a simulation that has been run in the
+    "long" layout of Simulation.create_utilization_data, with a row per node and
+    minute, and a "state" column of NodeState codes.
+    """
+    table = simulation.create_utilization_data(layout="long", dtype=np.float32)
+    table.insert(2, "state", simulation.node_states().ravel())
+    return table
+
+
+def write_table(frame, path, file_format="parquet"):
+    """
+    Writes a DataFrame without its index to a file of a format of _EXTENSIONS,
+    creating its directory. The file is written to a temporary file first, so
+    readers of the results never see a partly written file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = path + ".{}.tmp".format(os.getpid())
+    if file_format == "parquet":
+        frame.to_parquet(temporary, index=False)
+    elif file_format == "arrow":
+        frame.reset_index(drop=True).to_feather(temporary)
+    elif file_format == "csv":
+        frame.to_csv(temporary, index=False)
+    else:
+        raise ValueError("Unknown file format: {}".format(file_format))
+    os.replace(temporary, path)
+
+
+def simulate_files(
+    configurations,
+    activity_paths,
+    output,
+    file_format="parquet",
+    processes=None,
+    engine="event",
+    seed=0,
+):
+    """
+    Simulates every configuration of a list with the user activity of every file
+    of 'activity_paths', see read_activity, across a pool of worker processes,
+    like sweep.sweep. Every run writes its results to 'output' as soon as it is
+    done, in directories partitioned by the name of the activity file without
+    its extension and the index of the configuration, which Parquet readers
+    such as pyarrow.dataset read as columns:
+
+    "utilization" - activity=NAME/configuration=INDEX/part-0 files of the
+                    utilization_table of every run.
+    "hourly_cost" - activity=NAME/configuration=INDEX/part-0 files of the "hour"
+                    and "cost" of every hour of every run.
+    "runs"        - a file with the settings and the numbers of
+                    Simulation.summary of every run, which is also returned as a
+                    DataFrame.
+
+    processes - the number of worker processes, by default one per CPU. With 1
+                the runs are simulated in this process.
+    seed      - the seed of the activity generated from hourly curves.
+    """
+    names = [os.path.splitext(os.path.basename(path))[0] for path in activity_paths]
+    if len(set(names)) != len(names):
+        raise ValueError("The names of the activity files must differ.")
+    tasks = [
+        (name, path, index, configuration)
+        for name, path in zip(names, activity_paths)
+        for index, configuration in enumerate(configurations)
+    ]
+    options = (output, file_format, engine, seed)
+
+    if processes == 1:
+        read = _cached_read_activity()
+        results = [_simulate_run(task, options, read) for task in tasks]
+    else:
+        with multiprocessing.Pool(
+            processes, initializer=_init_worker, initargs=options
+        ) as pool:
+            results = list(pool.imap_unordered(_simulate, tasks))
+
+    runs = pd.DataFrame(results)
+    if len(runs):
+        runs = runs.sort_values(["activity", "configuration"]).reset_index(drop=True)
+    write_table(
+        runs, os.path.join(output, "runs" + _EXTENSIONS[file_format]), file_format
+    )
+    return runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="z2jh-cost-simulator",
+        description=(
+            "Simulates the cost of JupyterHub clusters for user activity files, "
+            "and writes the utilization and cost of every run to files."
+        ),
+    )
+    parser.add_argument(
+        "configurations",
+        help="a JSON file with a configuration of the simulation or a list of them",
+    )
+    parser.add_argument(
+        "activity",
+        nargs="+",
+        help=(
+            "user activity trace files, or hourly curves of the number of "
+            "simultaneous users as JSON lists or comma separated numbers"
+        ),
+    )
+    parser.add_argument(
+        "-o", "--output", default="results", help="the directory of the results"
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(_EXTENSIONS),
+        default="parquet",
+        help="the file format of the results, parquet and arrow need pyarrow",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="the number of worker processes, by default one per CPU",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["event", "tick"],
+        default="event",
+        help="see Simulation.run",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="the seed of the activity generated from hourly curves",
+    )
+    args = parser.parse_args(argv)
+    if args.format != "csv" and pyarrow is None:
+        parser.error("--format {} needs pyarrow to be installed".format(args.format))
+
+    try:
+        runs = simulate_files(
+            read_configurations(args.configurations),
+            args.activity,
+            args.output,
+            file_format=args.format,
+            processes=args.processes,
+            engine=args.engine,
+            seed=args.seed,
+        )
+    except (OSError, ValueError) as error:
+        parser.exit(1, "{}: error: {}\n".format(parser.prog, error))
+    print("Simulated {} runs into {}".format(len(runs), args.output))
+
+
+# The output, file format, engine and seed of a worker process, and its
+# read_activity, set once when it starts.
+_worker_options = None
+_worker_read_activity = None
+
+
+def _init_worker(output, file_format, engine, seed):
+    global _worker_options, _worker_read_activity
+    _worker_options = (output, file_format, engine, seed)
+    _worker_read_activity = _cached_read_activity()
+
+
+def _cached_read_activity():
+    # Every activity file is read once per tick length, as the runs of all
+    # configurations of a file follow each other.
+    return functools.lru_cache(maxsize=4)(read_activity)
+
+
+def _simulate(task):
+    return _simulate_run(task, _worker_options, _worker_read_activity)
+
+
+def _simulate_run(task, options, read):
+    name, path, index, configuration = task
+    output, file_format, engine, seed = options
+    tick_minutes = time_settings(configuration)["tick_minutes"]
+    simulation = Simulation(configuration, read(path, tick_minutes, seed))
+    simulation.run(engine=engine)
+
+    partition = os.path.join(
+        "activity=" + name, "configuration=" + str(index), "part-0"
+    )
+    partition += _EXTENSIONS[file_format]
+    write_table(
+        utilization_table(simulation),
+        os.path.join(output, "utilization", partition),
+        file_format,
+    )
+    hourly_cost = simulation.cost_breakdown()["hourly_cost"].reset_index()
+    write_table(
+        hourly_cost, os.path.join(output, "hourly_cost", partition), file_format
+    )
+
+    result = {"activity": name, "configuration": index}
+    result.update(configuration)
+    result.update(simulation.summary())
+    return result
+
+
+def _read_hourly_users(path):
+    with open(path) as f:
+        text = f.read()
+    if path.endswith(".json"):
+        return json.loads(text)
+    return [int(value) for value in re.split(r"[\s,]+", text.strip()) if value]
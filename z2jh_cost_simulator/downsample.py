@@ -0,0 +1,66 @@
+"""
+Reduces per-minute results to fewer points for plotting, either aggregated into
+longer periods, or as the points of a line that keep its shape.
+"""
+
+import numpy as np
+
+
+def aggregate(values, minutes):
+    """
+    Returns the minimum, mean and maximum of the per-minute values of an array
+    over every period of 'minutes' minutes, along the last axis. The last period
+    is shorter if the number of minutes isn't divisible by 'minutes'.
+    """
+    values = np.asarray(values)
+    length = values.shape[-1]
+    starts = np.arange(0, length, minutes)
+    if length == 0:
+        empty = np.empty(values.shape[:-1] + (0,))
+        return empty.astype(values.dtype), empty, empty.astype(values.dtype)
+    sizes = np.diff(np.append(starts, length))
+    return (
+        np.minimum.reduceat(values, starts, axis=-1),
+        np.add.reduceat(values, starts, axis=-1, dtype=np.float64) / sizes,
+        np.maximum.reduceat(values, starts, axis=-1),
+    )
+
+
+def lttb(x, y, points):
+    """
+    Returns the indices of 'points' points of a line through (x, y) that keep the
+    look of the line, chosen with the Largest-Triangle-Three-Buckets algorithm.
+    All indices are returned for lines with no more points than that.
+
+    The first and last points are kept, and the points between them are split
+    into points - 2 buckets. From every bucket, the point is kept that makes the
+    largest triangle with the point kept from the previous bucket and the mean
+    of the next bucket, which keeps the peaks and dips of the line.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    length = len(y)
+    if points >= length:
+        return np.arange(length)
+    if points < 2:
+        raise ValueError("A downsampled line has at least 2 points.")
+
+    edges = np.linspace(1, length - 1, points - 1).astype(np.int64)
+    indices = np.empty(points, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = length - 1
+    for bucket in range(points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_x = x[stop : edges[bucket + 2]].mean()
+            next_y = y[stop : edges[bucket + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        previous = indices[bucket]
+        # Twice the area of the triangles with every point of the bucket.
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        indices[bucket + 1] = start + np.argmax(areas)
+    return indices
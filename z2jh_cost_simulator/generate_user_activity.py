@@ -1,36 +1,50 @@
-import random
 import numpy as np
 
+from .activity import ActivityIntervals
 
-def generate_user_activity(simultaneous_user_count):
+
+def generate_user_activity(
+    simultaneous_user_count, seed=None, intervals=False, tick_minutes=1
+):
     """Takes a list of integers representing the number of simultaneous users and provides a list of users and their 'user_activity'.
+    The user activity is returned as a (users x minutes) uint8 matrix, with a row of 0's and 1's per user.
+    seed - the seed of the random selection of active users, see generate_hourly_user_activity.
+    intervals - return the user activity as ActivityIntervals instead, without creating the matrix.
+    tick_minutes - the minutes of a column of the matrix, for a Simulation with the same "tick_minutes" configuration.
+    """
+    if 60 % tick_minutes != 0:
+        raise ValueError("The minutes of a tick must divide an hour.")
+    scale = 60 // tick_minutes
+    hourly_activity = generate_hourly_user_activity(simultaneous_user_count, seed=seed)
+    if intervals:
+        return ActivityIntervals.from_matrix(hourly_activity, scale=scale)
+    return scale_user_activity(hourly_activity, scale=scale)
+
+
+def scale_user_activity(user_activity, scale=60):
+    """This helper function expects a (users x periods) user activity matrix and will return it but with many more elements. For example, you could transition from a hour resolution to a minute resolution by scaling with 60."""
+    return np.repeat(np.asarray(user_activity, dtype=np.uint8), scale, axis=-1)
+
+
+def generate_hourly_user_activity(simultaneous_user_count, replicas=None, seed=None):
+    """
+    Like generate_user_activity, but returns which users are active in which hour as
+    a (users x hours) boolean matrix, drawn with a seeded numpy random generator.
+    With 'replicas', a (replicas x users x hours) matrix of independent draws is
+    returned, generated all at once.
+
+    As in generate_user_activity, there are as many users as the largest number of
+    simultaneous users so far, and each hour a random selection of them is active.
     """
-    user_pool = []
-    hour_wise_users = simultaneous_user_count
-    count_users = 0
-
-    for index in range(len(hour_wise_users)):
-
-        if count_users == hour_wise_users[index]:
-            for user_activity in random.sample(user_pool, k=hour_wise_users[index]):
-                _scale_user_activity(user_activity, index)
-        else:
-            if hour_wise_users[index] > count_users:
-                for user_activity in random.sample(user_pool, k=count_users):
-                    _scale_user_activity(user_activity, index)
-
-                for count in range(hour_wise_users[index] - count_users):
-                    user_activity = np.zeros(len(hour_wise_users) * 60)
-                    user_activity = _scale_user_activity(user_activity, index)
-                    user_pool.append(user_activity)
-                    count_users = count_users + 1
-            else:
-                for user_activity in random.sample(user_pool, k=hour_wise_users[index]):
-                    _scale_user_activity(user_activity, index)
-    return user_pool
-
-
-def _scale_user_activity(user_activity, index, scale=60):
-    """This helper function expects a user_activity list and will return it but with many more elements. For example, you could transition from a hour resolution to a minute resolution by scaling with 60."""
-    user_activity[index * scale : (index + 1) * scale] = 1
-    return user_activity
+    hour_wise_users = np.asarray(simultaneous_user_count, dtype=int)
+    shape = (1 if replicas is None else replicas, hour_wise_users.max(initial=0))
+    known_users = np.maximum.accumulate(hour_wise_users)
+
+    # Give every known user a random key each hour, and let the users with the
+    # lowest keys be the active ones.
+    keys = np.random.default_rng(seed).random(shape + (len(hour_wise_users),))
+    keys[:, np.arange(shape[1])[:, np.newaxis] >= known_users] = np.inf
+    ranks = np.argsort(np.argsort(keys, axis=1), axis=1)
+    hourly_activity = ranks < hour_wise_users
+
+    return hourly_activity[0] if replicas is None else hourly_activity
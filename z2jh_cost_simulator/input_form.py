@@ -13,11 +13,16 @@ class InputForm(ABC):
         pass
 
 
+import html
+
 import numpy as np
 import bqplot
 import bqplot.interacts
+import ipywidgets
 import random
 
+from .background import BackgroundSimulation
+
 
 class InteractiveInputForm(InputForm):
     """
@@ -25,6 +30,8 @@ class InteractiveInputForm(InputForm):
     """
 
     fig = None
+    # The BackgroundSimulation of get_cost_estimate and its observer of the line.
+    _cost_estimate = None
 
     def get_input_form(self, figure_title, no_users=100):
         if self.fig:
@@ -88,6 +95,69 @@ class InteractiveInputForm(InputForm):
 
         return self.fig.marks[0].y.astype(int)
 
+    def get_cost_estimate(self, configurations, hourly_users=None, delay=0.3):
+        """
+        Returns a widget with the cost of the users drawn in the form, which is
+        simulated again in the background whenever the line is redrawn, and shows
+        the cost of the days simulated so far while it runs, or the error the
+        simulation failed with.
+
+        The form has one cost estimate at a time: calling this again stops
+        updating the widget returned before.
+
+        hourly_users - a function returning the number of users every hour of the
+                       simulation, by default the users drawn for every day of a
+                       week.
+        delay        - the seconds the line has to be left unchanged before it is
+                       simulated, see BackgroundSimulation.
+        """
+        assert (
+            self.fig != None
+        ), "Make sure to first present the input form to the user."
+
+        if hourly_users is None:
+            # 24:00 is the same hour as 00:00.
+            hourly_users = lambda: self.get_data()[:-1].tolist() * 7
+
+        estimate = ipywidgets.HTML()
+
+        def _show_progress(progress):
+            if progress["done"]:
+                estimate.value = progress["simulation"].calculate_cost()
+            else:
+                estimate.value = "Costs for the first {} of {} days ${:.2f}...".format(
+                    progress["minute"] // 1440,
+                    progress["minutes"] // 1440,
+                    progress["cost"],
+                )
+
+        def _show_error(error):
+            estimate.value = "The simulation failed: {}".format(
+                html.escape(repr(error))
+            )
+
+        self.stop_cost_estimate()
+        background = BackgroundSimulation(
+            configurations, _show_progress, delay=delay, error_callback=_show_error
+        )
+
+        def _simulate_callback(change):
+            background.submit(hourly_users())
+
+        self.fig.marks[0].observe(_simulate_callback, names=["y"])
+        self._cost_estimate = (background, _simulate_callback)
+        background.submit(hourly_users())
+        return estimate
+
+    def stop_cost_estimate(self):
+        """Stops updating the widget of get_cost_estimate, if any."""
+        if self._cost_estimate is None:
+            return
+        background, simulate_callback = self._cost_estimate
+        self.fig.marks[0].unobserve(simulate_callback, names=["y"])
+        background.shutdown()
+        self._cost_estimate = None
+
     def set_default_figure(self):
         
         self.fig.marks[0].y = [0] * 10 + [30] * 1 + [31] * 5 + [30] * 1 + [0] * 8
@@ -0,0 +1,94 @@
+import json
+import time
+
+import pandas as pd
+
+
+class Instrumentation:
+    """
+    Records where the time of Simulation.run goes, when given to a Simulation.
+    For every phase of a simulated minute, see Simulation.tick_phases, it records
+    the number of calls, the time spent, and the number of pods created,
+    scheduled or culled, or nodes started or stopped. The "event" engine records
+    the same phases, and the "numba" backend records a single "kernel" phase.
+
+    Without an instrumentation, run only checks that it has none.
+    """
+
+    def __init__(self, trace=False):
+        """
+        trace - also record every call, for to_chrome_trace.
+        """
+        self.phases = {}
+        self.trace = trace
+        self.events = []
+        self._origin = time.perf_counter()
+
+    def record(self, phase, minute, begin, end=None, count=0):
+        """
+        Records a call of a phase for a minute, which started at 'begin' and ended
+        at 'end', by default now, as given by time.perf_counter. Returns 'end'.
+        """
+        if end is None:
+            end = time.perf_counter()
+        statistics = self.phases.get(phase)
+        if statistics is None:
+            statistics = self.phases[phase] = {"calls": 0, "time": 0.0, "count": 0}
+        statistics["calls"] += 1
+        statistics["time"] += end - begin
+        statistics["count"] += count
+        if self.trace:
+            self.events.append((phase, minute, begin, end, count))
+        return end
+
+    def to_dict(self):
+        """
+        Returns the "calls", "time" in seconds and "count" of pods or nodes of
+        every phase, by phase name.
+        """
+        return {phase: dict(statistics) for phase, statistics in self.phases.items()}
+
+    def to_dataframe(self):
+        """
+        Returns the numbers of to_dict as a DataFrame with a row per phase, and
+        the time per call and share of the total time.
+        """
+        phases = pd.DataFrame.from_dict(
+            self.phases, orient="index", columns=["calls", "time", "count"]
+        )
+        phases.index.name = "phase"
+        phases["time_per_call"] = phases["time"] / phases["calls"]
+        phases["time_share"] = phases["time"] / phases["time"].sum()
+        return phases
+
+    def to_chrome_trace(self, path=None):
+        """
+        Returns the recorded calls in the Chrome trace event format, which
+        chrome://tracing and Perfetto show as a timeline, and writes it to 'path'
+        if given. Calls are only recorded with 'trace'.
+        """
+        trace = {
+            "traceEvents": [
+                {
+                    "name": phase,
+                    "cat": "simulation",
+                    "ph": "X",
+                    "ts": (begin - self._origin) * 1e6,
+                    "dur": (end - begin) * 1e6,
+                    "pid": 0,
+                    "tid": 0,
+                    "args": {"minute": minute, "count": count},
+                }
+                for phase, minute, begin, end, count in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(trace, f)
+        return trace
+
+    def reset(self):
+        """Forgets everything recorded so far."""
+        self.phases = {}
+        self.events = []
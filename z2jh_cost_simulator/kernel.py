@@ -0,0 +1,159 @@
+"""
+The minute by minute simulation of Simulation.run as a single function over flat
+arrays, which numba compiles when it is installed, see Simulation.run's backend.
+"""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# The NodeState codes, see simulator.NodeState.
+_STOPPED = 0
+_STARTING = 1
+_RUNNING = 2
+_STOPPING = 3
+
+
+def tick_kernel(
+    activity,
+    start,
+    stop,
+    min_nodes,
+    node_stop_time,
+    pod_inactivity_time,
+    pod_max_lifetime,
+    node_start_time,
+    most_utilized,
+    capacity,
+    node_state,
+    running_from,
+    utilization,
+    constant_since,
+    has_pod,
+    pod_node,
+    pod_start_time,
+    last_active,
+    node_states,
+    node_utilization,
+):
+    """
+    Simulates the minutes from 'start' to 'stop' like the "tick" engine, and
+    writes the state and utilized capacity of every node for these minutes to the
+    columns of the (nodes x stop - start) 'node_states' and 'node_utilization'.
+
+    The state of the nodes and the pods is given and updated in place as arrays:
+
+    node_state     - the NodeState code of every node at 'start'.
+    running_from   - the minute a Starting node becomes Running.
+    utilization    - the utilized capacity of every node at 'start'.
+    constant_since - the first minute of the period the utilized capacity of a
+                     node has been unchanged, see Timeline.constant_since.
+    has_pod, pod_node and pod_start_time - the pods of the users, see UserPool.
+    last_active    - the last minute every user was active, or -1.
+
+    most_utilized  - schedule pods on the most utilized node with room if True,
+                     and on the least utilized one otherwise.
+    """
+    user_count = activity.shape[0]
+    node_count = capacity.shape[0]
+    pod_count = np.zeros(node_count, dtype=np.int64)
+    for user in range(user_count):
+        if pod_node[user] >= 0:
+            pod_count[pod_node[user]] += 1
+    previous_utilization = utilization.copy()
+
+    for t in range(start, stop):
+        # Nodes finishing their start or stop
+        if t > start:
+            for node in range(node_count):
+                if node_state[node] == _STARTING and t >= running_from[node]:
+                    node_state[node] = _RUNNING
+                elif node_state[node] == _STOPPING:
+                    node_state[node] = _STOPPED
+
+        # Create user pods for active users without a pod
+        for user in range(user_count):
+            if activity[user, t] != 0:
+                last_active[user] = t
+                has_pod[user] = True
+
+        # Scheduler: place pending pods in order on the most, or least, utilized
+        # node with room, the first one on ties.
+        for user in range(user_count):
+            if not has_pod[user] or pod_node[user] >= 0:
+                continue
+            chosen = -1
+            for node in range(node_count):
+                if utilization[node] >= capacity[node]:
+                    continue
+                if chosen < 0:
+                    chosen = node
+                elif most_utilized and utilization[node] > utilization[chosen]:
+                    chosen = node
+                elif not most_utilized and utilization[node] < utilization[chosen]:
+                    chosen = node
+            if chosen < 0:
+                break
+            pod_node[user] = chosen
+            pod_start_time[user] = t
+            utilization[chosen] += 1
+            pod_count[chosen] += 1
+
+        # Cluster Autoscaler (CA): start nodes
+        for node in range(node_count):
+            if node_state[node] == _STOPPED and pod_count[node] > 0:
+                node_state[node] = _STARTING
+                running_from[node] = t + node_start_time
+                if node_start_time == 0:
+                    node_state[node] = _RUNNING
+
+        # Cluster Autoscaler (CA): stop nodes
+        if t >= node_stop_time:
+            started_count = 0
+            for node in range(node_count):
+                if node_state[node] == _RUNNING:
+                    started_count += 1
+            for node in range(node_count):
+                if node_state[node] != _RUNNING:
+                    continue
+                if started_count <= min_nodes:
+                    break
+                since = constant_since[node]
+                if utilization[node] != previous_utilization[node]:
+                    since = t
+                if utilization[node] == 0 and since <= t - node_stop_time:
+                    node_state[node] = _STOPPING
+                    started_count -= 1
+
+        # Pod Culler: cull for inactivity or max lifetime
+        for user in range(user_count):
+            node = pod_node[user]
+            if node < 0:
+                continue
+            if (
+                pod_inactivity_time > 0 and last_active[user] < t - pod_inactivity_time
+            ) or (
+                pod_max_lifetime > 0 and t - pod_start_time[user] >= pod_max_lifetime
+            ):
+                has_pod[user] = False
+                pod_node[user] = -1
+                pod_start_time[user] = 0
+                if utilization[node] > 0:
+                    utilization[node] -= 1
+                pod_count[node] -= 1
+
+        for node in range(node_count):
+            node_states[node, t - start] = node_state[node]
+            node_utilization[node, t - start] = utilization[node]
+            if utilization[node] != previous_utilization[node]:
+                constant_since[node] = t
+                previous_utilization[node] = utilization[node]
+
+
+# The compiled kernel, or None when numba isn't installed.
+compiled_tick_kernel = None
+if numba is not None:
+    compiled_tick_kernel = numba.njit(cache=True)(tick_kernel)
@@ -0,0 +1,103 @@
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from .generate_user_activity import generate_hourly_user_activity, scale_user_activity
+from .simulator import Simulation, time_settings
+
+
+def run_monte_carlo(
+    configurations,
+    simultaneous_user_count,
+    replicas=100,
+    seed=0,
+    processes=None,
+    percentiles=(50, 90, 95),
+    engine="event",
+):
+    """
+    Simulates a configuration with many randomly generated user activities for
+    the same hourly number of simultaneous users, as a single simulation only
+    gives one of the possible costs.
+
+    The activity of all replicas is generated at once from 'seed', so the results
+    are reproducible regardless of the number of worker processes. Returns a dict
+    of:
+
+    "replicas" - a DataFrame with the numbers of Simulation.summary per replica.
+    "summary"  - a DataFrame with the mean, a 95% confidence interval of the mean,
+                 and the given percentiles of the total cost and peak node count.
+
+    processes - the number of worker processes, by default one per CPU. With 1 the
+                replicas are simulated in this process.
+    """
+    hourly_activity = generate_hourly_user_activity(
+        simultaneous_user_count, replicas=replicas, seed=seed
+    )
+    tasks = list(enumerate(hourly_activity))
+
+    if processes == 1:
+        results = [_simulate_replica(task, configurations, engine) for task in tasks]
+    else:
+        with multiprocessing.Pool(
+            processes, initializer=_init_worker, initargs=(configurations, engine)
+        ) as pool:
+            results = list(pool.imap_unordered(_simulate, tasks))
+
+    replica_results = (
+        pd.DataFrame(results).sort_values("replica").reset_index(drop=True)
+    )
+    return {
+        "replicas": replica_results,
+        "summary": summarize_replicas(replica_results, percentiles),
+    }
+
+
+def summarize_replicas(replica_results, percentiles=(50, 90, 95)):
+    """
+    Returns the mean, a 95% confidence interval of the mean, and the percentiles
+    of the total cost and peak node count of the replicas.
+    """
+    summary = {}
+    for column in ["total_cost", "peak_nodes"]:
+        values = replica_results[column].to_numpy(dtype=float)
+        mean = np.mean(values)
+        margin = np.nan
+        if len(values) > 1:
+            margin = 1.96 * np.std(values, ddof=1) / np.sqrt(len(values))
+        statistics = {
+            "mean": mean,
+            "mean_ci_low": mean - margin,
+            "mean_ci_high": mean + margin,
+        }
+        for percentile in percentiles:
+            statistics["p{}".format(percentile)] = np.percentile(values, percentile)
+        summary[column] = statistics
+    return pd.DataFrame(summary)
+
+
+# The configurations and engine of a worker process, set once when it starts.
+_worker_configurations = None
+_worker_engine = None
+
+
+def _init_worker(configurations, engine):
+    global _worker_configurations, _worker_engine
+    _worker_configurations = configurations
+    _worker_engine = engine
+
+
+def _simulate(task):
+    return _simulate_replica(task, _worker_configurations, _worker_engine)
+
+
+def _simulate_replica(task, configurations, engine):
+    index, hourly_activity = task
+    tick_minutes = time_settings(configurations)["tick_minutes"]
+    user_activity = scale_user_activity(hourly_activity, 60 // tick_minutes)
+    simulation = Simulation(configurations, user_activity)
+    simulation.run(engine=engine)
+    result = {"replica": index}
+    result.update(simulation.summary())
+    return result
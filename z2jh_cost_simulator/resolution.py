@@ -0,0 +1,72 @@
+"""
+Simulates at a coarser time resolution than minutes, see simulator.time_settings,
+and reports how far the costs are from those of a simulation minute by minute.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from .activity import ActivityIntervals, as_activity
+from .simulator import Simulation
+
+
+def coarsen_activity(user_activity, tick_minutes):
+    """
+    Returns per-minute user activity as a (users x ticks) uint8 matrix with a
+    column per tick of 'tick_minutes' minutes, in which a user is active if they
+    were active in any minute of the tick. The last tick is shorter if the
+    minutes aren't divisible by 'tick_minutes'.
+    """
+    activity = as_activity(user_activity)
+    if isinstance(activity, ActivityIntervals):
+        activity = activity.to_matrix()
+    if activity.shape[1] == 0:
+        return activity
+    starts = np.arange(0, activity.shape[1], tick_minutes)
+    return np.maximum.reduceat(activity != 0, starts, axis=1).view(np.uint8)
+
+
+def resolution_report(configurations, user_activity, ticks=(5, 15), engine="event"):
+    """
+    Simulates the configurations with per-minute user activity, and again with
+    the activity coarsened to each tick length of 'ticks' in minutes, and
+    returns a DataFrame with a row per tick length of its "tick_minutes", the
+    "total_cost", "node_hours" and "peak_nodes" of Simulation.summary, the
+    "cost_error" relative to the per-minute cost, and the "seconds" the
+    simulation took. The first row is the per-minute simulation.
+
+    Ticks make the simulation cheaper, but time settings are rounded to whole
+    ticks, and nodes and pods start and stop at the start of a tick, so the
+    report shows if a tick length is good enough for a configuration.
+    """
+    rows = []
+    for tick_minutes in (1,) + tuple(tick for tick in ticks if tick != 1):
+        tick_configurations = dict(configurations, tick_minutes=tick_minutes)
+        activity = user_activity
+        if tick_minutes != 1:
+            activity = coarsen_activity(user_activity, tick_minutes)
+        begin = time.perf_counter()
+        simulation = Simulation(tick_configurations, activity)
+        simulation.run(engine=engine)
+        seconds = time.perf_counter() - begin
+        summary = simulation.summary()
+        rows.append(
+            {
+                "tick_minutes": tick_minutes,
+                "total_cost": summary["total_cost"],
+                "node_hours": summary["node_hours"],
+                "peak_nodes": summary["peak_nodes"],
+                "seconds": seconds,
+            }
+        )
+
+    report = pd.DataFrame(rows)
+    minute_cost = report["total_cost"].iloc[0]
+    report.insert(
+        4,
+        "cost_error",
+        (report["total_cost"] - minute_cost) / minute_cost if minute_cost else 0.0,
+    )
+    return report
@@ -0,0 +1,114 @@
+from abc import ABC, abstractmethod
+import heapq
+
+
+class Scheduler(ABC):
+    """Places pending user pods on the nodes of the simulation."""
+
+    @abstractmethod
+    def schedule(self, pending_pods, node_pool, time):
+        """
+        Places as many of the pending pods as possible, in order, and returns the
+        pods that were placed.
+        """
+        pass
+
+    def pod_removed(self, node, time):
+        """Called when a pod has been removed from a node at the given time."""
+        pass
+
+    def reset(self):
+        """Called when the pods of the nodes have been changed without the scheduler."""
+        pass
+
+
+class _IndexedScheduler(Scheduler):
+    """
+    Keeps the nodes with room in a heap ordered by the key of the policy, so a
+    batch of pending pods is placed without sorting the node pool for each pod.
+
+    Entries are (key, node index, utilized capacity). Instead of updating an
+    entry when a node's utilization changes, a new entry is pushed and entries
+    not matching the node's current utilization are skipped when popped.
+    """
+
+    def __init__(self):
+        self._node_pool = None
+        self._heap = []
+
+    @abstractmethod
+    def _key(self, utilized_capacity, node_index):
+        pass
+
+    def schedule(self, pending_pods, node_pool, time):
+        if self._node_pool is not node_pool or len(self._heap) > 4 * len(node_pool):
+            self._build(node_pool, time)
+
+        scheduled_pods = []
+        for user_pod in pending_pods:
+            node_index = self._pop_node_with_room(time)
+            if node_index is None:
+                # No node has room, so neither will the rest of the pods.
+                break
+            node = node_pool[node_index]
+            node.add_pod_ref(user_pod, time)
+            scheduled_pods.append(user_pod)
+            self._push(node_index, time)
+        return scheduled_pods
+
+    def reset(self):
+        self._node_pool = None
+
+    def pod_removed(self, node, time):
+        # Nodes of another node pool are left to the rebuild of the next schedule.
+        node_index = self._node_indices.get(id(node)) if self._node_pool else None
+        if node_index is not None:
+            self._push(node_index, time)
+
+    def _build(self, node_pool, time):
+        self._node_pool = node_pool
+        self._node_indices = {id(node): index for index, node in enumerate(node_pool)}
+        self._heap = []
+        for node_index in range(len(node_pool)):
+            self._push(node_index, time)
+
+    def _push(self, node_index, time):
+        node = self._node_pool[node_index]
+        utilized_capacity = node.utilized_capacity[time]
+        if utilized_capacity < node.capacity:
+            heapq.heappush(
+                self._heap,
+                (
+                    self._key(utilized_capacity, node_index),
+                    node_index,
+                    utilized_capacity,
+                ),
+            )
+
+    def _pop_node_with_room(self, time):
+        while self._heap:
+            _, node_index, utilized_capacity = heapq.heappop(self._heap)
+            if self._node_pool[node_index].utilized_capacity[time] == utilized_capacity:
+                return node_index
+        return None
+
+
+class MostUtilizedScheduler(_IndexedScheduler):
+    """
+    Places pods on the most utilized node that still has room, the first one in
+    the node pool on ties. This packs users on few nodes, so that others can be
+    stopped, and is the default.
+    """
+
+    def _key(self, utilized_capacity, node_index):
+        return (-utilized_capacity, node_index)
+
+
+class LeastUtilizedScheduler(_IndexedScheduler):
+    """
+    Places pods on the least utilized node that still has room, the first one in
+    the node pool on ties. This spreads users over the nodes.
+    """
+
+    def _key(self, utilized_capacity, node_index):
+        return (utilized_capacity, node_index)
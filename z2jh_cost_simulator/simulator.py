@@ -1,22 +1,79 @@
+import copy
 import enum
+import heapq
+import time
 from enum import Enum
 import numpy as np
 import pandas as pd
 
+from .checkpoint import Checkpoint
+from .downsample import aggregate
+from .activity import (
+    ActivityIntervals,
+    activity_runs,
+    as_activity,
+    next_active_minute,
+    next_idle_deadline,
+)
+from .kernel import compiled_tick_kernel
+from .scheduler import LeastUtilizedScheduler, MostUtilizedScheduler
+from .timeline import Timeline
+
 
 class User:
     """
-    The user object should be initialized with the activity to simulate during a full week.
+    A view of one user of a UserPool. The activity and pod state of the users are
+    stored in arrays of the UserPool, which this object reads and writes.
     """
 
-    def __init__(self, simulation_time):
+    __slots__ = ("user_pool", "index")
+
+    def __init__(self, user_pool, index):
         """
-        simulation_time - the duration of the simulation(in minutes) . 
+        user_pool - the UserPool of the user.
+        index     - the index of the user in the UserPool.
         """
-        self.activity = np.array(simulation_time)
-        self.has_pod = False
-        self.node_assigned_to_pod = None
-        self.pod_start_time = 0
+        self.user_pool = user_pool
+        self.index = index
+
+    @property
+    def activity(self):
+        return self.user_pool.activity[self.index]
+
+    @property
+    def has_pod(self):
+        return bool(self.user_pool.has_pod[self.index])
+
+    @has_pod.setter
+    def has_pod(self, has_pod):
+        self.user_pool.has_pod[self.index] = has_pod
+
+    @property
+    def node_assigned_to_pod(self):
+        node_index = self.user_pool.pod_node[self.index]
+        return None if node_index < 0 else self.user_pool.node_pool[node_index]
+
+    @node_assigned_to_pod.setter
+    def node_assigned_to_pod(self, node):
+        self.user_pool.pod_node[self.index] = -1 if node is None else node.index
+
+    @property
+    def pod_start_time(self):
+        return int(self.user_pool.pod_start_time[self.index])
+
+    @pod_start_time.setter
+    def pod_start_time(self, pod_start_time):
+        self.user_pool.pod_start_time[self.index] = pod_start_time
+
+    @property
+    def activity_runs(self):
+        return self.user_pool.activity_runs(self.index)
+
+    def next_active_minute(self, time):
+        return self.user_pool.next_active_minute(self.index, time)
+
+    def idle_deadline(self, time, window):
+        return self.user_pool.idle_deadline(self.index, time, window)
 
     @property
     def pod_is_pending(self):
@@ -27,9 +84,134 @@ class User:
         return self.node_assigned_to_pod != None
 
 
-class NodeState(enum.Enum):
+class UserPool:
+    """
+    The users of a simulation. Their activity is stored as one (users x minutes)
+    uint8 matrix or as ActivityIntervals, and their pod state as one array per
+    attribute instead of as one object per user. Indexing the pool returns a User
+    view of one user.
+    """
+
+    def __init__(self, activity, node_pool):
+        """
+        activity  - the (users x minutes) activity matrix, see as_activity_matrix,
+                    or ActivityIntervals.
+        node_pool - the nodes that the pod_node array refers to by index.
+        """
+        self.activity = activity
+        self.node_pool = node_pool
+        self.has_pod = np.zeros(len(activity), dtype=bool)
+        self.pod_node = np.full(len(activity), -1, dtype=np.int32)
+        self.pod_start_time = np.zeros(len(activity), dtype=np.int64)
+        self._users = [None] * len(activity)
+        self._activity_runs = [None] * len(activity)
+        self._idle_deadlines = [None] * len(activity)
+        # Which users are active at _active_time, followed from minute to minute
+        # when the activity is given as intervals.
+        self._active = None
+        self._active_time = None
+
+    def __len__(self):
+        return len(self.activity)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        user = self._users[index]
+        if user is None:
+            user = self._users[index] = User(self, index)
+        return user
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def create_pods(self, time):
+        """Creates pods for all active users without a pod and returns their indices."""
+        new_pods = np.flatnonzero(self.active_users(time) & ~self.has_pod)
+        self.has_pod[new_pods] = True
+        return new_pods
+
+    def active_users(self, time):
+        """Returns a boolean array of which users are active at the given minute."""
+        if not isinstance(self.activity, ActivityIntervals):
+            return self.activity[:, time] != 0
+        if self._active_time is not None and self._active_time == time - 1:
+            starting, ending = self.activity.changes(time)
+            self._active[ending] = False
+            self._active[starting] = True
+        elif self._active_time != time:
+            self._active = self.activity.active_users(time)
+        self._active_time = time
+        return self._active
+
+    def pending_pods(self):
+        """Returns the users with a pod that is not scheduled, in order."""
+        pending = np.flatnonzero(self.has_pod & (self.pod_node < 0))
+        return [self[index] for index in pending]
+
+    def activity_runs(self, index):
+        """The periods of activity of a user, computed once from the activity."""
+        if self._activity_runs[index] is None:
+            if isinstance(self.activity, ActivityIntervals):
+                self._activity_runs[index] = self.activity.runs(index)
+            else:
+                self._activity_runs[index] = activity_runs(self.activity[index])
+        return self._activity_runs[index]
+
+    def next_active_minute(self, index, time):
+        """Returns the first minute from 'time' and onwards where a user is active, or None."""
+        starts, ends = self.activity_runs(index)
+        return next_active_minute(starts, ends, time)
+
+    def idle_deadline(self, index, time, window):
+        """
+        Returns the first minute from 'time' and onwards where a user has been inactive
+        for the last 'window' + 1 minutes, which is when the pod culler culls the pod.
+        The deadline is remembered, as it is the same when asked again before it has passed.
+        """
+        if self._idle_deadlines[index] is not None:
+            since, cached_window, deadline = self._idle_deadlines[index]
+            if since <= time <= deadline and cached_window == window:
+                return deadline
+        starts, ends = self.activity_runs(index)
+        deadline = next_idle_deadline(starts, ends, time, window)
+        self._idle_deadlines[index] = (time, window, deadline)
+        return deadline
+
+
+def time_settings(configurations):
+    """
+    Returns the length of a tick, the time step of the simulation, and the time
+    settings of the configurations converted from minutes to ticks, as a dict of
+    "tick_minutes", "pod_inactivity_time", "pod_max_lifetime", "node_stop_time"
+    and "node_start_time".
+
+    The configurations give the minutes of a tick as "tick_minutes", 1 by
+    default, and the minutes nodes take to start as "node_start_time", 5 by
+    default. The settings are rounded to the nearest number of ticks, but a
+    culling or node stop setting that isn't 0 is at least one tick, as 0 turns
+    culling off and stops idle nodes right away.
+    """
+    tick_minutes = configurations.get("tick_minutes", 1)
+
+    def ticks(minutes, at_least=0):
+        return max(int(minutes / tick_minutes + 0.5), at_least if minutes > 0 else 0)
+
+    return {
+        "tick_minutes": tick_minutes,
+        "pod_inactivity_time": ticks(configurations["pod_inactivity_time"], 1),
+        "pod_max_lifetime": ticks(configurations["pod_max_lifetime"], 1),
+        "node_stop_time": ticks(configurations["node_stop_time"], 1),
+        "node_start_time": ticks(configurations.get("node_start_time", 5)),
+    }
+
+
+class NodeState(enum.IntEnum):
     """
     This class maintains the state of the Node.
+    The values are also the int8 codes of the per-minute state arrays, which compare
+    equal to the members, for example started_state.to_array()[t] == NodeState.Running.
     """
 
     Stopped = 0
@@ -43,18 +225,30 @@ class Node:
     Node class will be initialized with the capacity of user pods that can be scheduled on the node.
     """
 
-    def __init__(self, simulation_time, capacity=20):
+    def __init__(self, simulation_time, capacity=20, index=0):
         """
         simulation_time - the duration of simulation(in minutes)
-        The utilization of the node for every minute of the simulation time is also stored.
+        index - the index of the node in the node pool.
+        The utilization of the node for every minute of the simulation time is also stored,
+        as timelines that only record the minutes where the state or utilization changes.
         """
         self.capacity = capacity
-        self.started_state = np.array(
-            [NodeState.Stopped for i in range(simulation_time)]
+        self.index = index
+        self.started_state = Timeline(
+            simulation_time, value=NodeState.Stopped, dtype=np.int8
         )
-        self.utilized_capacity = np.zeros(simulation_time)
+        self.utilized_capacity = Timeline(simulation_time)
         self.list_pods = []
 
+    def add_pod_ref(self, user_pod, time):
+        """
+        This method is invoked when a user pod is scheduled on the node.
+        """
+        user_pod.node_assigned_to_pod = self
+        user_pod.pod_start_time = time
+        self.list_pods.append(user_pod)
+        self.utilized_capacity[time:] = self.utilized_capacity[time] + 1
+
     def remove_pod_ref(self, user_pod, time):
         """
         This method is invoked when a user pod is culled.
@@ -63,56 +257,96 @@ class Node:
         """
         user_pod.has_pod = False
         user_pod.node_assigned_to_pod = None
-        user_pod.start_time = 0
+        user_pod.pod_start_time = 0
         if self.utilized_capacity[time] > 0:
             self.utilized_capacity[time:] = self.utilized_capacity[time] - 1
         self.list_pods.remove(user_pod)
 
+    def state_at(self, time):
+        """Returns the NodeState of the node at the given minute."""
+        return NodeState(self.started_state[time])
+
+    def is_idle(self, time, duration):
+        """
+        Returns True if no pods have been scheduled on the node from 'time' - 'duration' to 'time'.
+        """
+        return (
+            self.utilized_capacity[time] == 0
+            and self.utilized_capacity.constant_since(time) <= time - duration
+        )
+
+
+# Kinds of events for the "event" engine of Simulation.run
+_CREATE_POD = 0
+_CULL_POD = 1
+_WAKE_UP = 2
+
 
 # The main class for running the simulation
 class Simulation:
-    def __init__(self, configurations, user_activity):
+    def __init__(
+        self, configurations, user_activity, scheduler=None, instrumentation=None
+    ):
         """
         configurations - Settings for Node memory/CPU usage, user pod memory/CPU usage and the configurations for pod culling.
+                         Times are in minutes, and the simulation steps by ticks of "tick_minutes", see time_settings.
         
         user_activity  - The list of the activity of different users. 
                          Each user's activity is an array of 10080 minutes of 0's and 1's(0 for inactivity and 1 for active) 
+                         It is stored as a (users x minutes) matrix, see as_activity_matrix.
+                         With a "tick_minutes" configuration, every column is a tick instead of a minute.
+                         ActivityIntervals are used as they are.
+
+        scheduler      - The Scheduler placing user pods on nodes, by default a MostUtilizedScheduler.
+
+        instrumentation - An Instrumentation recording the time spent in every phase of run, if any.
         """
 
         self.configurations = configurations
         self.node_pool = []
         self.user_pool = []
-        self.user_activity = user_activity
-        self.simulation_time = len(user_activity[0])
+        self.user_activity = as_activity(user_activity)
+        self.simulation_time = self.user_activity.shape[1]
         self.start_time = 0
         self.utilization_data = pd.DataFrame()
+        self.scheduler = scheduler or MostUtilizedScheduler()
+        self.instrumentation = instrumentation
+        # The time settings in ticks, see time_settings, updated by run so the
+        # phases of a tick don't convert them again.
+        self._time_settings = time_settings(configurations)
 
-    def _add_nodes(self):
+    def _node_capacity(self):
 
         # Calculate the capacity of the node, given the node resource(memory) and
         # user resource(memory).
-        # Initialize the node pool with nodes for the selected min and max number of nodes.
         node_capacity = 0
         node_available_memory = self.configurations["node_memory"] - .216
         # 216 MB is the approx. node memory used by system pods.
         node_capacity = node_available_memory / self.configurations["user_pod_memory"]
+        # rounding off the value to get the capacity.
+        return round(node_capacity)
+
+    def _add_nodes(self):
+
+        # Initialize the node pool with nodes for the selected min and max number of nodes.
         for node_count in range(
-            self.configurations["min_nodes"], self.configurations["max_nodes"]
+            len(self.node_pool) + self.configurations["min_nodes"],
+            self.configurations["max_nodes"],
         ):
-            # rounding off the value to get the capacity.
             self.node_pool.append(
-                Node(self.simulation_time, capacity=round(node_capacity))
+                Node(
+                    self.simulation_time,
+                    capacity=self._node_capacity(),
+                    index=len(self.node_pool),
+                )
             )
 
     def _add_users(self):
         """Initialize the user list with the user activity
         """
-        for activity in self.user_activity:
-            user = User(self.simulation_time)
-            user.activity = activity
-            self.user_pool.append(user)
+        self.user_pool = UserPool(self.user_activity, self.node_pool)
 
-    def run(self, stop=0):
+    def run(self, stop=0, engine="tick", backend="python"):
         """
         The run method runs the simulation. 
         If 'stop' value is 0, then the simulation runs for the total duration. Specifying a value for 'stop' will run the simulation till the 'stop' time.
@@ -121,176 +355,705 @@ class Simulation:
         2. Try scheduling the user pods.
         3. Auto scale the nodes.
         4. Cull the pods according to the pod culling configuration.
+
+        engine - "tick" visits every minute, "event" only visits the minutes where
+                 something can change. Both produce the same result and can be
+                 mixed between calls.
+        backend - "numba" runs the minutes with a compiled kernel over flat arrays,
+                  see kernel.tick_kernel, which gives the same result as the
+                  engines. It falls back to "python", the engine, when numba isn't
+                  installed or with a scheduler the kernel doesn't implement.
         """
+        if engine not in ("tick", "event"):
+            raise ValueError("Unknown simulation engine: {}".format(engine))
+        if backend not in ("python", "numba"):
+            raise ValueError("Unknown simulation backend: {}".format(backend))
+
         if stop == 0:
             stop = self.simulation_time
+        self._time_settings = time_settings(self.configurations)
 
         if len(self.user_pool) == 0:
             self._add_users()
         if len(self.node_pool) == 0:
             self._add_nodes()
 
+        instrumentation = self.instrumentation
+        most_utilized = self._kernel_policy()
+        if (
+            backend == "numba"
+            and compiled_tick_kernel is not None
+            and most_utilized is not None
+        ):
+            begin = time.perf_counter()
+            self._run_kernel(stop, compiled_tick_kernel, most_utilized)
+            if instrumentation is not None:
+                instrumentation.record("kernel", self.start_time, begin)
+            self.start_time = stop
+            return
+
+        if engine == "event":
+            self._run_events(stop)
+            self.start_time = stop
+            return
+
+        phases = self.tick_phases()
+        for t in range(self.start_time, stop):
+            for name, phase in phases:
+                if instrumentation is None:
+                    phase(t)
+                else:
+                    begin = time.perf_counter()
+                    instrumentation.record(name, t, begin, count=phase(t))
+        self.start_time = stop
+
+    def tick_phases(self):
+        """
+        Returns the phases of every minute of the "tick" engine in order, as pairs
+        of a name and a function taking the minute. The functions return the
+        number of pods or nodes they changed, which an Instrumentation records.
+        A subclass can replace phases or add its own.
+        """
+        return [
+            ("create_pods", self._create_pods),
+            ("schedule_pods", self._schedule_pods),
+            ("start_nodes", self._start_nodes),
+            ("stop_nodes", self._stop_nodes),
+            ("cull_pods", self._cull_pods),
+        ]
+
+    def _create_pods(self, t):
+        """Create user pods for active users without a pod"""
+        return len(self.user_pool.create_pods(t))
+
+    def _schedule_pods(self, t):
+        """
+        Scheduler is responsible of placement of pending pods, by default
+        on the most resource utilized node that still has room.
+        """
+        ## Identify pods to schedule
+        pending_pods = self.user_pool.pending_pods()
+        if not pending_pods:
+            return 0
+        return len(self.scheduler.schedule(pending_pods, self.node_pool, t))
+
+    def _start_nodes(self, t):
+        """
+        Cluster Autoscaler (CA): start nodes
+        The CA looks for 'Stopped' nodes which have some pods assigned to them,
+        and transitions the state of those nodes from 'Stopped' to 'Running'
+        """
+        nodes_to_start = [
+            node
+            for node in self.node_pool
+            if node.started_state[t] == NodeState.Stopped and len(node.list_pods) > 0
+        ]
+        node_start_time = self._time_settings["node_start_time"]
+        for node in nodes_to_start:
+            assert len(node.list_pods) > 0
+            node.started_state[t : t + node_start_time] = NodeState.Starting
+            node.started_state[t + node_start_time :] = NodeState.Running
+        return len(nodes_to_start)
+
+    def _stop_nodes(self, t):
+        """
+        Cluster Autoscaler (CA): stop nodes
+        If a node doesn't have any pods scheduled to it for a certain interval of time(node_stop_time), the CA makes the node 'Stopped'.
+        """
+        node_stop_time = self._time_settings["node_stop_time"]
+        if t < node_stop_time:
+            return 0
+        started_nodes = [
+            node
+            for node in self.node_pool
+            if node.started_state[t] == NodeState.Running
+        ]
+        no_of_started_nodes = len(started_nodes)  # count of started nodes
+        stopped = 0
+        for node in started_nodes:
+            if no_of_started_nodes > self.configurations["min_nodes"]:
+                if node.is_idle(t, node_stop_time):
+                    node.started_state[t] = NodeState.Stopping
+                    node.started_state[t + 1 :] = NodeState.Stopped
+                    no_of_started_nodes -= 1
+                    stopped += 1
+            else:
+                break
+        return stopped
+
+    def _cull_pods(self, t):
+        """Pod Culler"""
+        settings = self._time_settings
         ## The amount of time a user is allowed to be inactive before the user's pod is culled
-        pod_culling_max_inactivity_time = self.configurations["pod_inactivity_time"]
+        pod_culling_max_inactivity_time = settings["pod_inactivity_time"]
 
         ## The amount of time a pod is allowed to live before it is culled
-        pod_culling_max_lifetime = self.configurations["pod_max_lifetime"]
+        pod_culling_max_lifetime = settings["pod_max_lifetime"]
+
+        culled = 0
+        for node in self.node_pool:
+            pods_assigned_to_node = [user_pod for user_pod in node.list_pods]
+            for user_pod in pods_assigned_to_node:
+
+                """
+                Pod Culler: cull for inactivity
+
+                The Pod Culler deletes the user pods of users who have been inactive 
+                for a too long interval of time (pod_culling_max_inactivity_time)
+                """
+
+                if pod_culling_max_inactivity_time > 0:
+                    if user_pod.idle_deadline(t, pod_culling_max_inactivity_time) == t:
+                        node.remove_pod_ref(user_pod, t)
+                        self.scheduler.pod_removed(node, t)
+                        culled += 1
+                        continue
+
+                """
+                Pod Culler: cull for max lifetime
+
+                The Pod Culler deletes the user pods that has been running for too long (pod_culling_max_lifetime)
+                If pod_culling_max_lifetime is 0 then the user pod has infinite lifetime.
+                """
+
+                if pod_culling_max_lifetime > 0:
+                    if t - user_pod.pod_start_time >= pod_culling_max_lifetime:
+                        node.remove_pod_ref(user_pod, t)
+                        self.scheduler.pod_removed(node, t)
+                        culled += 1
+        return culled
+
+    def _run_events(self, stop):
+        """
+        Runs the simulation from self.start_time to 'stop' by jumping between the
+        minutes where something can happen, instead of visiting every minute.
+
+        The minutes visited are activity edges of users without a pod, culling
+        deadlines of assigned pods, nodes finishing their start, nodes reaching
+        node_stop_time of idleness and the minute after a pod was culled while
+        other pods are pending. Every visited minute runs the same steps as a
+        minute of the "tick" engine, and all other minutes would have been no-ops.
+        """
+        settings = self._time_settings
+        pod_culling_max_inactivity_time = settings["pod_inactivity_time"]
+        pod_culling_max_lifetime = settings["pod_max_lifetime"]
+        node_stop_time = settings["node_stop_time"]
+        node_start_time = settings["node_start_time"]
+        instrumentation = self.instrumentation
+        t = self.start_time
+
+        queue = []
+
+        def push(time, kind, index):
+            if time is not None and time < stop:
+                heapq.heappush(queue, (time, kind, index))
+
+        def cull_time(user_index, time):
+            user_pod = self.user_pool[user_index]
+            deadlines = []
+            if pod_culling_max_inactivity_time > 0:
+                deadlines.append(
+                    user_pod.idle_deadline(time, pod_culling_max_inactivity_time)
+                )
+            if pod_culling_max_lifetime > 0:
+                deadlines.append(
+                    max(time, user_pod.pod_start_time + pod_culling_max_lifetime)
+                )
+            return min(deadlines) if deadlines else None
+
+        # Rebuild the pending events from the current state, so that the engines
+        # can be mixed between calls to run.
+        user_pool = self.user_pool
+        for index in np.flatnonzero(~user_pool.has_pod):
+            push(user_pool.next_active_minute(index, t), _CREATE_POD, index)
+        pending_pods = set(
+            np.flatnonzero(user_pool.has_pod & (user_pool.pod_node < 0)).tolist()
+        )
+        for index in np.flatnonzero(user_pool.pod_node >= 0):
+            push(cull_time(index, t), _CULL_POD, index)
+        push(t, _WAKE_UP, -1)
+        for node in self.node_pool if t < self.simulation_time else []:
+            if node.started_state[t] == NodeState.Starting:
+                push(node.started_state.next_change(t), _WAKE_UP, -1)
+            if node.utilized_capacity[t] == 0:
+                idle_since = node.utilized_capacity.constant_since(t)
+                push(max(idle_since + node_stop_time, t), _WAKE_UP, -1)
+
+        while queue:
+            t = queue[0][0]
+            pods_to_create = []
+            pods_to_cull = []
+            while queue and queue[0][0] == t:
+                _, kind, index = heapq.heappop(queue)
+                if kind == _CREATE_POD:
+                    pods_to_create.append(index)
+                elif kind == _CULL_POD:
+                    pods_to_cull.append(index)
+
+            if instrumentation is not None:
+                begin = time.perf_counter()
 
-        for t in range(self.start_time, stop):
             # Create user pods for active users without a pod
-            for user in self.user_pool:
-                if user.activity[t] == 1 and user.has_pod == False:
+            created = 0
+            for index in pods_to_create:
+                user = self.user_pool[index]
+                if user.next_active_minute(t) == t and user.has_pod == False:
                     user.has_pod = True
+                    pending_pods.add(index)
+                    created += 1
+            if instrumentation is not None:
+                begin = instrumentation.record("create_pods", t, begin, count=created)
 
-            """
-            Scheduler is responsible of placement of pending pods
-            on the most resource utilized node that still has room.
-            """
-            ## Identify pods to schedule
-            pending_pods = [
-                user_pod
-                for user_pod in self.user_pool
-                if user_pod.has_pod == True and user_pod.pod_is_pending
-            ]
-            count = 0
-            for user_pod in pending_pods:
-                ## Find a node to schedule the pod on
-                sorted_node_pool = sorted(
+            # Scheduler, see _schedule_pods
+            scheduled_on = []
+            if pending_pods:
+                pending_indices = sorted(pending_pods)
+                scheduled_pods = self.scheduler.schedule(
+                    [self.user_pool[index] for index in pending_indices],
                     self.node_pool,
-                    key=lambda node: node.utilized_capacity[t],
-                    reverse=True,
+                    t,
                 )
-                for node in sorted_node_pool:
-
-                    if node.utilized_capacity[t] < node.capacity:
-                        user_pod.node_assigned_to_pod = node
-                        user_pod.pod_start_time = t
-                        node.list_pods.append(user_pod)
-                        node.utilized_capacity[t:] = node.utilized_capacity[t] + 1
-                        break
-
-            """
-            Cluster Autoscaler (CA): start nodes
-            The CA looks for 'Stopped' nodes which have some pods assigned to them,
-            and transitions the state of those nodes from 'Stopped' to 'Running'
-            """
-            nodes_to_start = [
-                node
-                for node in self.node_pool
-                if node.started_state[t] == NodeState.Stopped
-                and len(node.list_pods) > 0
-            ]
-            for node in nodes_to_start:
-                assert len(node.list_pods) > 0
-                node.started_state[t : t + 5] = NodeState.Starting
-                node.started_state[t + 5 :] = NodeState.Running
-
-            """
-            Cluster Autoscaler (CA): stop nodes
-            If a node doesn't have any pods scheduled to it for a certain interval of time(node_stop_time), the CA makes the node 'Stopped'.
-            """
-            node_stop_time = self.configurations["node_stop_time"]
-            if t >= node_stop_time:
-                started_nodes = [
-                    node
-                    for node in self.node_pool
-                    if node.started_state[t] == NodeState.Running
-                ]
-                no_of_started_nodes = len(started_nodes)  # count of started nodes
-                for node in started_nodes:
-                    if no_of_started_nodes > self.configurations["min_nodes"]:
-                        if (
-                            np.sum(node.utilized_capacity[t - node_stop_time : t + 1])
-                            == 0
-                        ):
-                            node.started_state[t] = NodeState.Stopping
-                            node.started_state[t + 1 :] = NodeState.Stopped
-                            no_of_started_nodes -= 1
+                scheduled_pods = set(map(id, scheduled_pods))
+                for index in pending_indices:
+                    user_pod = self.user_pool[index]
+                    if id(user_pod) not in scheduled_pods:
+                        continue
+                    pending_pods.discard(index)
+                    scheduled_on.append(user_pod.node_assigned_to_pod)
+                    # A pod scheduled late may be culled right away
+                    deadline = cull_time(index, t)
+                    if deadline == t:
+                        pods_to_cull.append(index)
                     else:
-                        break
-
-            # Pod Culler
-            for node in self.node_pool:
-                pods_assigned_to_node = [user_pod for user_pod in node.list_pods]
-                for user_pod in pods_assigned_to_node:
-
-                    """
-                    Pod Culler: cull for inactivity
-
-                    The Pod Culler deletes the user pods of users who have been inactive 
-                    for a too long interval of time (pod_culling_max_inactivity_time)
-                    """
-
-                    if pod_culling_max_inactivity_time > 0:
-                        if (
-                            t >= pod_culling_max_inactivity_time
-                            and np.sum(
-                                user_pod.activity[
-                                    t - pod_culling_max_inactivity_time : t + 1
-                                ]
-                            )
-                            == 0
-                        ):
-                            node.remove_pod_ref(user_pod, t)
-                            continue
-
-                    """
-                    Pod Culler: cull for max lifetime
-
-                    The Pod Culler deletes the user pods that has been running for too long (pod_culling_max_lifetime)
-                    If pod_culling_max_lifetime is 0 then the user pod has infinite lifetime.
-                    """
-
-                    if pod_culling_max_lifetime > 0:
-                        if t - user_pod.pod_start_time >= pod_culling_max_lifetime:
-                            node.remove_pod_ref(user_pod, t)
-        self.start_time = stop
+                        push(deadline, _CULL_POD, index)
+            if instrumentation is not None:
+                begin = instrumentation.record(
+                    "schedule_pods", t, begin, count=len(scheduled_on)
+                )
+
+            # Cluster Autoscaler (CA): start nodes, see _start_nodes
+            started = 0
+            for node in scheduled_on:
+                if node.started_state[t] == NodeState.Stopped:
+                    node.started_state[t : t + node_start_time] = NodeState.Starting
+                    node.started_state[t + node_start_time :] = NodeState.Running
+                    if node_start_time > 0:
+                        push(t + node_start_time, _WAKE_UP, -1)
+                    started += 1
+            if instrumentation is not None:
+                begin = instrumentation.record("start_nodes", t, begin, count=started)
+
+            # Cluster Autoscaler (CA): stop nodes
+            stopped = self._stop_nodes(t)
+            if instrumentation is not None:
+                begin = instrumentation.record("stop_nodes", t, begin, count=stopped)
+
+            # Pod Culler, see _cull_pods
+            for index in pods_to_cull:
+                user_pod = self.user_pool[index]
+                node = user_pod.node_assigned_to_pod
+                node.remove_pod_ref(user_pod, t)
+                self.scheduler.pod_removed(node, t)
+                if node.utilized_capacity[t] == 0:
+                    push(t + max(node_stop_time, 1), _WAKE_UP, -1)
+                push(user_pod.next_active_minute(t + 1), _CREATE_POD, index)
+            if pods_to_cull and pending_pods:
+                push(t + 1, _WAKE_UP, -1)
+            if instrumentation is not None:
+                instrumentation.record("cull_pods", t, begin, count=len(pods_to_cull))
+
+    def _kernel_policy(self):
+        """
+        Returns the most_utilized argument of kernel.tick_kernel for the
+        scheduler, or None if the kernel doesn't implement the scheduler.
+        """
+        if type(self.scheduler) is MostUtilizedScheduler:
+            return True
+        if type(self.scheduler) is LeastUtilizedScheduler:
+            return False
+        return None
+
+    def _run_kernel(self, stop, kernel, most_utilized):
+        """
+        Runs the simulation from self.start_time to 'stop' with a kernel over flat
+        arrays, see kernel.tick_kernel, and stores the result in the timelines of
+        the nodes and the arrays of the user pool, as the engines would have.
+        """
+        start = self.start_time
+        if start >= stop:
+            return
+        activity = self.user_activity
+        if isinstance(activity, ActivityIntervals):
+            activity = activity.to_matrix()
+        state = self._kernel_state()
+        user_pool = self.user_pool
+        node_states = np.empty((len(self.node_pool), stop - start), dtype=np.int8)
+        node_utilization = np.empty((len(self.node_pool), stop - start), dtype=np.int64)
 
-    def create_utilization_data(self):
-        # Storing the node wise per minute utilization data.
-        time_data = list(range(self.simulation_time))
+        settings = time_settings(self.configurations)
+        kernel(
+            activity,
+            start,
+            stop,
+            self.configurations["min_nodes"],
+            settings["node_stop_time"],
+            settings["pod_inactivity_time"],
+            settings["pod_max_lifetime"],
+            settings["node_start_time"],
+            most_utilized,
+            state["capacity"],
+            state["node_state"],
+            state["running_from"],
+            state["utilization"],
+            state["constant_since"],
+            user_pool.has_pod,
+            user_pool.pod_node,
+            user_pool.pod_start_time,
+            state["last_active"],
+            node_states,
+            node_utilization,
+        )
+        self._store_kernel_state(stop, state, node_states, node_utilization)
 
-        node_data = {"time": time_data}
+    def _kernel_state(self):
+        """
+        Returns the state of the nodes at self.start_time as the arrays of
+        kernel.tick_kernel, and the last minute every user was active.
+        """
+        start = self.start_time
+        activity = self.user_activity
+        node_pool = self.node_pool
+        state = {
+            "capacity": np.array([node.capacity for node in node_pool], dtype=np.int64),
+            "node_state": np.array(
+                [node.started_state[start] for node in node_pool], dtype=np.int8
+            ),
+            "running_from": np.array(
+                [
+                    node.started_state.next_change(start) or self.simulation_time
+                    for node in node_pool
+                ],
+                dtype=np.int64,
+            ),
+            "utilization": np.array(
+                [node.utilized_capacity[start] for node in node_pool], dtype=np.int64
+            ),
+            "constant_since": np.array(
+                [node.utilized_capacity.constant_since(start) for node in node_pool],
+                dtype=np.int64,
+            ),
+            "last_active": np.full(len(self.user_pool), -1, dtype=np.int64),
+        }
+        if start > 0:
+            if isinstance(activity, ActivityIntervals):
+                activity = activity.to_matrix()
+            past = activity[:, :start][:, ::-1]
+            active = past.any(axis=1)
+            state["last_active"][active] = start - 1 - np.argmax(past[active], axis=1)
+        return state
 
+    def _store_kernel_state(self, stop, state, node_states, node_utilization):
+        """
+        Stores the (nodes x minutes) states and utilized capacities of the nodes
+        from self.start_time to 'stop', and the state at 'stop', that a kernel
+        returned in the timelines of the nodes, and schedules the pods of the user
+        pool on them in the order they were scheduled.
+        """
+        start = self.start_time
+        node_state = state["node_state"]
+        running_from = state["running_from"]
+        utilization = state["utilization"]
+        user_pool = self.user_pool
         for index, node in enumerate(self.node_pool):
-            node_data_utilized_capacity = []
-            node_data_utilized_percent = []
+            # The minutes after 'stop' continue from the state at 'stop'.
+            states = np.empty(self.simulation_time, dtype=np.int8)
+            states[:start] = node.started_state[:start]
+            states[start:stop] = node_states[index]
+            states[stop:] = node_state[index]
+            if node_state[index] == NodeState.Starting:
+                states[running_from[index] :] = NodeState.Running
+            elif node_state[index] == NodeState.Stopping:
+                states[stop:] = NodeState.Stopped
+            node.started_state = Timeline.from_array(states, dtype=np.int8)
 
-            for i in range(self.simulation_time):
-                node_data_utilized_capacity.append(node.utilized_capacity[i])
-                node_data_utilized_percent.append(
-                    (node.utilized_capacity[i] / node.capacity)
-                )
+            capacities = np.empty(self.simulation_time, dtype=np.int64)
+            capacities[:start] = node.utilized_capacity[:start]
+            capacities[start:stop] = node_utilization[index]
+            capacities[stop:] = utilization[index]
+            node.utilized_capacity = Timeline.from_array(capacities)
 
-            node_data[
-                "node" + str(index) + "_utilized_capacity"
-            ] = node_data_utilized_capacity
-            node_data[
-                "node" + str(index) + "_utilized_percent"
-            ] = node_data_utilized_percent
+            # The pods of a node are in the order they were scheduled.
+            pods = np.flatnonzero(user_pool.pod_node == index)
+            pods = pods[np.argsort(user_pool.pod_start_time[pods], kind="stable")]
+            node.list_pods = [user_pool[pod] for pod in pods]
+        self.scheduler.reset()
 
-            self.utilization_data = pd.DataFrame(data=node_data)
+    def checkpoint(self):
+        """
+        Returns a Checkpoint of the state of the simulation at self.start_time,
+        the minute it has been run to, which restore can return to.
+        """
+        if len(self.user_pool) == 0:
+            self._add_users()
+        if len(self.node_pool) == 0:
+            self._add_nodes()
+        user_pool = self.user_pool
+        return Checkpoint(
+            self.start_time,
+            dict(self.configurations),
+            user_pool.has_pod.copy(),
+            user_pool.pod_node.copy(),
+            user_pool.pod_start_time.copy(),
+            [
+                {
+                    "capacity": node.capacity,
+                    "started_state": node.started_state.copy(),
+                    "utilized_capacity": node.utilized_capacity.copy(),
+                    "pods": np.array([user.index for user in node.list_pods]),
+                }
+                for node in self.node_pool
+            ],
+        )
+
+    def restore(self, checkpoint):
+        """
+        Returns the simulation to the state of a Checkpoint, from where run
+        continues. The minutes after the checkpoint are simulated again, with the
+        configurations of this simulation, which may differ from the ones of the
+        checkpoint as long as the nodes are the same or more.
+        """
+        if len(checkpoint.nodes) > len(
+            range(self.configurations["min_nodes"], self.configurations["max_nodes"])
+        ) or any(
+            node["capacity"] != self._node_capacity() for node in checkpoint.nodes
+        ):
+            raise ValueError(
+                "The nodes of the checkpoint don't match the configurations."
+            )
+
+        self.start_time = checkpoint.start_time
+        if len(self.user_pool) == 0:
+            self._add_users()
+        user_pool = self.user_pool
+        user_pool.has_pod[:] = checkpoint.has_pod
+        user_pool.pod_node[:] = checkpoint.pod_node
+        user_pool.pod_start_time[:] = checkpoint.pod_start_time
+
+        del self.node_pool[:]
+        for index, checkpoint_node in enumerate(checkpoint.nodes):
+            node = Node(
+                self.simulation_time, capacity=checkpoint_node["capacity"], index=index
+            )
+            node.started_state = checkpoint_node["started_state"].copy()
+            node.utilized_capacity = checkpoint_node["utilized_capacity"].copy()
+            node.list_pods = [user_pool[pod] for pod in checkpoint_node["pods"]]
+            self.node_pool.append(node)
+        # Nodes added by the configurations have been stopped so far.
+        self._add_nodes()
+        self.scheduler.reset()
+
+    def fork(self, **configurations):
+        """
+        Returns a new simulation that continues from where this one has been run
+        to, with some configurations changed, for example
+        sim.fork(pod_max_lifetime=120). Running it only simulates the minutes
+        after the fork, and leaves this simulation as it is.
+
+        The fork shares the user activity with this simulation instead of copying
+        it, and the periods of activity that have been computed from it.
+        """
+        forked = Simulation(
+            dict(self.configurations, **configurations),
+            self.user_activity,
+            scheduler=copy.copy(self.scheduler),
+        )
+        forked.restore(self.checkpoint())
+        forked.user_pool._activity_runs = list(self.user_pool._activity_runs)
+        return forked
+
+    def node_states(self):
+        """
+        Returns the state of every node for every minute as a (nodes x minutes)
+        int8 matrix of NodeState codes.
+        """
+        states = np.empty((len(self.node_pool), self.simulation_time), dtype=np.int8)
+        for index, node in enumerate(self.node_pool):
+            states[index] = node.started_state.to_array()
+        return states
+
+    def node_utilization(self, dtype=np.float64):
+        """
+        Returns the utilized capacity of every node for every minute as a
+        (nodes x minutes) matrix.
+        """
+        utilization = np.empty((len(self.node_pool), self.simulation_time), dtype=dtype)
+        for index, node in enumerate(self.node_pool):
+            utilization[index] = node.utilized_capacity.to_array()
+        return utilization
+
+    def create_utilization_data(self, layout="wide", dtype=np.float64):
+        """
+        Returns the node wise per minute utilization data as a DataFrame, which is
+        also stored as self.utilization_data.
+
+        layout - "wide" gives a "time" column and a "nodeX_utilized_capacity" and
+                 "nodeX_utilized_percent" column per node. "long" gives one row per
+                 node and minute with "time", "node", "utilized_capacity" and
+                 "utilized_percent" columns.
+        dtype  - the dtype of the utilization columns, for example np.float32 to
+                 halve the memory used.
+        """
+        if layout not in ("wide", "long"):
+            raise ValueError("Unknown utilization data layout: {}".format(layout))
+
+        # The capacity and percent of each node are rows of a single matrix,
+        # which the DataFrame uses as its columns without copying them.
+        node_count = len(self.node_pool)
+        data = np.empty((2 * node_count, self.simulation_time), dtype=dtype)
+        data[0::2] = self.node_utilization(dtype=dtype)
+        capacities = np.array([node.capacity for node in self.node_pool], dtype=dtype)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(data[0::2], capacities[:, np.newaxis], out=data[1::2])
+        # The minute of every tick.
+        tick_minutes = time_settings(self.configurations)["tick_minutes"]
+        time_data = np.arange(self.simulation_time) * tick_minutes
+
+        if layout == "wide":
+            columns = []
+            for index in range(node_count):
+                columns.append("node" + str(index) + "_utilized_capacity")
+                columns.append("node" + str(index) + "_utilized_percent")
+            self.utilization_data = pd.DataFrame(data.T, columns=columns, copy=False)
+            self.utilization_data.insert(0, "time", time_data)
+        else:
+            self.utilization_data = pd.DataFrame(
+                {
+                    "time": np.tile(time_data, node_count),
+                    "node": np.repeat(np.arange(node_count), self.simulation_time),
+                    "utilized_capacity": data[0::2].ravel(),
+                    "utilized_percent": data[1::2].ravel(),
+                }
+            )
         return self.utilization_data
 
-    def calculate_cost(self):
-        """Calculate the cost for using the jupyter hub deployment for one week.
+    def utilization_pyramid(self, levels=(1, 5, 60, 1440)):
         """
-        list_nodes = list(
-            node
-            for node in self.utilization_data.columns
-            if node.find("utilized_capacity") != -1
+        Returns the utilized percent of every node aggregated to periods of
+        several lengths, for plotting the utilization at any zoom level without
+        sending every minute of every node. The result is a dict with a DataFrame
+        per period length in minutes from 'levels', with a "time" column of the
+        first minute of every period and a "nodeX_utilized_percent_min",
+        "nodeX_utilized_percent_mean" and "nodeX_utilized_percent_max" column
+        per node.
+
+        Periods shorter than a tick, see time_settings, are a tick long.
+
+        See downsample.lttb for choosing points of a line to plot instead.
+        """
+        tick_minutes = time_settings(self.configurations)["tick_minutes"]
+        capacities = np.array([node.capacity for node in self.node_pool], dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent = self.node_utilization() / capacities[:, np.newaxis]
+
+        pyramid = {}
+        for minutes in levels:
+            ticks = max(minutes // tick_minutes, 1)
+            statistics = aggregate(percent, ticks)
+            data = {"time": np.arange(0, self.simulation_time, ticks) * tick_minutes}
+            for index in range(len(self.node_pool)):
+                for name, values in zip(("min", "mean", "max"), statistics):
+                    column = "node{}_utilized_percent_{}".format(index, name)
+                    data[column] = values[index]
+            pyramid[minutes] = pd.DataFrame(data)
+        return pyramid
+
+    def cost_breakdown(self, billing="state"):
+        """
+        Returns the cost of the simulated cluster as a dict of:
+
+        "total"       - the total cost.
+        "nodes"       - a DataFrame with a row per node of the hours it was Starting,
+                        Running and Stopping, the billed hours and their cost.
+        "hourly_cost" - a Series with the cost of every hour of the simulation.
+        "daily_cost"  - a Series with the cost of every day of the simulation.
+
+        billing - "state" bills a node for every minute it isn't Stopped, "utilization"
+                  only bills the minutes with user pods on the node.
+        """
+        if billing not in ("state", "utilization"):
+            raise ValueError("Unknown billing: {}".format(billing))
+
+        # calcluate the cost per hour from the cost_per_month
+        cost_per_hour = self.configurations["cost_per_month"] / 720
+        tick_minutes = time_settings(self.configurations)["tick_minutes"]
+
+        def hours(ticks):
+            return ticks * tick_minutes / 60
+
+        states = self.node_states()
+        if billing == "state":
+            billed = states != NodeState.Stopped
+        else:
+            billed = self.node_utilization() > 0
+
+        nodes = pd.DataFrame(
+            {
+                "starting_hours": hours(np.sum(states == NodeState.Starting, axis=1)),
+                "running_hours": hours(np.sum(states == NodeState.Running, axis=1)),
+                "stopping_hours": hours(np.sum(states == NodeState.Stopping, axis=1)),
+                "billed_hours": hours(np.sum(billed, axis=1)),
+            },
+            index=pd.Index(range(len(self.node_pool)), name="node"),
         )
-        cost_per_hour = (
-            self.configurations["cost_per_month"] / 720
-        )  # calcluate the cost per hour from the cost_per_month
-        total_no_hours_used = 0
-        for node in list_nodes:
-            # Number of hours the cluster is utilized in one week.
-            total_no_hours_used = (
-                total_no_hours_used
-                + len(self.utilization_data[(self.utilization_data[node] > 0)]) / 60
+        nodes["cost"] = nodes["billed_hours"] * cost_per_hour
+
+        # The billed ticks of all nodes, summed per hour and day.
+        billed_ticks = np.sum(billed, axis=0)
+        if 60 % tick_minutes == 0:
+            hourly_ticks = np.add.reduceat(
+                billed_ticks, np.arange(0, self.simulation_time, 60 // tick_minutes)
             )
+        else:
+            hour = np.arange(self.simulation_time) * tick_minutes // 60
+            hourly_ticks = np.bincount(hour, weights=billed_ticks)
+        hourly_cost = pd.Series(hours(hourly_ticks) * cost_per_hour, name="cost")
+        hourly_cost.index.name = "hour"
+        daily_cost = hourly_cost.groupby(hourly_cost.index // 24).sum()
+        daily_cost.index.name = "day"
+
+        return {
+            "total": nodes["cost"].sum(),
+            "nodes": nodes,
+            "hourly_cost": hourly_cost,
+            "daily_cost": daily_cost,
+        }
 
-        total_cost_utilization = cost_per_hour * total_no_hours_used
+    def summary(self):
+        """
+        Returns the key numbers of a simulation that has been run as a dict: the total
+        cost, the billed node hours, the peak number of started nodes and user pods,
+        and the mean utilization of the started nodes.
+        """
+        states = self.node_states()
+        started = states != NodeState.Stopped
+        utilization = self.node_utilization()
+        capacities = np.array([node.capacity for node in self.node_pool])
+        started_capacity = np.sum(started * capacities[:, np.newaxis])
+        cost = self.cost_breakdown()
+        return {
+            "total_cost": cost["total"],
+            "node_hours": cost["nodes"]["billed_hours"].sum(),
+            "peak_nodes": int(np.max(np.sum(started, axis=0), initial=0)),
+            "peak_pods": int(np.max(np.sum(utilization, axis=0), initial=0)),
+            "mean_utilization": (
+                np.sum(utilization) / started_capacity if started_capacity else 0.0
+            ),
+        }
+
+    def calculate_cost(self, billing="state"):
+        """Calculate the cost for using the jupyter hub deployment for one week.
+        See cost_breakdown for the costs as numbers.
+        """
+        total_cost_utilization = self.cost_breakdown(billing=billing)["total"]
         currency_format = "Total costs for one week ${:.2f}."
         return currency_format.format(total_cost_utilization)
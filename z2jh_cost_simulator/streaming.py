@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from .activity import as_activity_matrix
+from .simulator import Node, NodeState, Simulation, time_settings
+
+
+def activity_chunks(user_activity, chunk_minutes):
+    """
+    Yields the (users x minutes) user activity in chunks of 'chunk_minutes'
+    minutes. The user activity can be a memory-mapped array, for example from
+    np.load(path, mmap_mode="r"), and is then only read one chunk at a time.
+    """
+    for start in range(0, user_activity.shape[1], chunk_minutes):
+        yield user_activity[:, start : start + chunk_minutes]
+
+
+def stream(configurations, activity_chunks, engine="event", scheduler=None):
+    """
+    Simulates user activity given as consecutive chunks of minutes, for example
+    from activity_chunks or a generator, and yields a dict of aggregates for each
+    chunk as soon as it has been simulated.
+
+    Only one chunk is held and simulated at a time. The pods of the users and the
+    state of the nodes are carried over from one chunk to the next, so the memory
+    used depends on the size of the chunks instead of the simulated duration, and
+    the results are the same as when simulating all of the activity at once.
+
+    The dicts have the index of the "chunk", its "start" and "stop" minute, and
+    its "total_cost", "node_hours", "pod_hours", "peak_nodes", "peak_pods" and
+    "mean_utilization", see Simulation.summary.
+
+    engine    - the engine of Simulation.run to use.
+    scheduler - the Scheduler placing user pods on nodes, see Simulation.
+    """
+    # Every chunk is simulated after the last ticks of the previous one, which
+    # the pod culler and the cluster autoscaler look back at. These also cover
+    # the time it takes to start a node.
+    settings = time_settings(configurations)
+    history = max(
+        settings["pod_inactivity_time"],
+        settings["node_stop_time"],
+        settings["node_start_time"],
+    )
+    cost_per_hour = configurations["cost_per_month"] / 720
+    tick_minutes = settings["tick_minutes"]
+
+    simulation = None
+    start = 0
+    for index, chunk in enumerate(activity_chunks):
+        chunk = as_activity_matrix(chunk)
+        if simulation is None:
+            tail = 0
+            simulation = Simulation(configurations, chunk, scheduler=scheduler)
+        else:
+            tail = min(history, simulation.simulation_time)
+            simulation = _continue_simulation(simulation, chunk, tail)
+        simulation.run(engine=engine)
+
+        states = simulation.node_states()[:, tail:]
+        utilization = simulation.node_utilization()[:, tail:]
+        started = states != NodeState.Stopped
+        capacities = np.array([node.capacity for node in simulation.node_pool])
+        started_capacity = np.sum(started * capacities[:, np.newaxis])
+        stop = start + chunk.shape[1]
+        yield {
+            "chunk": index,
+            "start": start,
+            "stop": stop,
+            "total_cost": np.sum(started) * tick_minutes / 60 * cost_per_hour,
+            "node_hours": np.sum(started) * tick_minutes / 60,
+            "pod_hours": np.sum(utilization) * tick_minutes / 60,
+            "peak_nodes": int(np.max(np.sum(started, axis=0), initial=0)),
+            "peak_pods": int(np.max(np.sum(utilization, axis=0), initial=0)),
+            "mean_utilization": (
+                np.sum(utilization) / started_capacity if started_capacity else 0.0
+            ),
+        }
+        start = stop
+
+
+def run_stream(configurations, activity_chunks, engine="event", scheduler=None):
+    """
+    Returns the results of stream as a DataFrame with a row per chunk.
+    """
+    return pd.DataFrame(
+        list(stream(configurations, activity_chunks, engine, scheduler))
+    )
+
+
+def _continue_simulation(previous, chunk, tail):
+    """
+    Returns a simulation of the chunk following a simulation that has been run.
+    Its activity starts with the last 'tail' minutes of the previous one, which
+    aren't simulated again, and it continues from the state the previous
+    simulation ended in.
+    """
+    activity = np.concatenate(
+        (previous.user_activity[:, previous.simulation_time - tail :], chunk), axis=1
+    )
+    simulation = Simulation(previous.configurations, activity, previous.scheduler)
+    simulation.start_time = tail
+    # The previous minutes are 'shift' minutes earlier in this simulation.
+    shift = previous.simulation_time - tail
+    last = previous.simulation_time - 1
+
+    node_start_time = time_settings(previous.configurations)["node_start_time"]
+    for previous_node in previous.node_pool:
+        node = Node(
+            simulation.simulation_time,
+            capacity=previous_node.capacity,
+            index=previous_node.index,
+        )
+        node.started_state = previous_node.started_state.window(
+            shift, simulation.simulation_time
+        )
+        node.utilized_capacity = previous_node.utilized_capacity.window(
+            shift, simulation.simulation_time
+        )
+        # Node state changes past the end of the previous simulation weren't
+        # stored in its timelines.
+        state = previous_node.state_at(last)
+        if state == NodeState.Stopping:
+            node.started_state[tail:] = NodeState.Stopped
+        elif state == NodeState.Starting:
+            running = previous_node.started_state.constant_since(last) + node_start_time
+            node.started_state[running - shift :] = NodeState.Running
+        simulation.node_pool.append(node)
+
+    simulation._add_users()
+    user_pool = simulation.user_pool
+    user_pool.has_pod[:] = previous.user_pool.has_pod
+    user_pool.pod_node[:] = previous.user_pool.pod_node
+    user_pool.pod_start_time[:] = np.where(
+        user_pool.pod_node >= 0, previous.user_pool.pod_start_time - shift, 0
+    )
+    for node, previous_node in zip(simulation.node_pool, previous.node_pool):
+        node.list_pods = [user_pool[user.index] for user in previous_node.list_pods]
+    return simulation
@@ -0,0 +1,91 @@
+import itertools
+import multiprocessing
+
+import pandas as pd
+
+from .activity import as_activity
+from .simulator import Simulation
+
+
+def configuration_grid(configurations, **options):
+    """
+    Returns a list of configurations, one for every combination of the options.
+    For example, configuration_grid(configurations, max_nodes=[5, 10],
+    pod_inactivity_time=[30, 60, 90]) returns six configurations that are like
+    'configurations' apart from those settings.
+    """
+    names = list(options)
+    grid = []
+    for values in itertools.product(*(options[name] for name in names)):
+        configuration = dict(configurations)
+        configuration.update(zip(names, values))
+        grid.append(configuration)
+    return grid
+
+
+def sweep(configurations, user_activity, processes=None, engine="event"):
+    """
+    Simulates every configuration of a list with the same user activity across a
+    pool of worker processes, and yields a dict for each configuration as soon as
+    it has been simulated. The dicts have the index of the configuration as
+    "configuration", its settings and the numbers of Simulation.summary.
+
+    The user activity is handed to each worker process once when it starts, not
+    with every configuration.
+
+    processes - the number of worker processes, by default one per CPU. With 1
+                the configurations are simulated in this process.
+    engine    - the engine of Simulation.run to use.
+    """
+    user_activity = as_activity(user_activity)
+    tasks = list(enumerate(configurations))
+
+    if processes == 1:
+        for index, configuration in tasks:
+            yield _simulate_configuration(index, configuration, user_activity, engine)
+        return
+
+    with multiprocessing.Pool(
+        processes, initializer=_init_worker, initargs=(user_activity, engine)
+    ) as pool:
+        for result in pool.imap_unordered(_simulate, tasks):
+            yield result
+
+
+def run_sweep(configurations, user_activity, processes=None, engine="event"):
+    """
+    Returns the results of sweep as a DataFrame with a row per configuration.
+    """
+    results = pd.DataFrame(
+        list(sweep(configurations, user_activity, processes, engine))
+    )
+    if len(results):
+        results = results.sort_values("configuration").reset_index(drop=True)
+    return results
+
+
+# The user activity and engine of a worker process, set once when it starts.
+_worker_user_activity = None
+_worker_engine = None
+
+
+def _init_worker(user_activity, engine):
+    global _worker_user_activity, _worker_engine
+    _worker_user_activity = user_activity
+    _worker_engine = engine
+
+
+def _simulate(task):
+    index, configuration = task
+    return _simulate_configuration(
+        index, configuration, _worker_user_activity, _worker_engine
+    )
+
+
+def _simulate_configuration(index, configuration, user_activity, engine):
+    simulation = Simulation(configuration, user_activity)
+    simulation.run(engine=engine)
+    result = {"configuration": index}
+    result.update(configuration)
+    result.update(simulation.summary())
+    return result
@@ -0,0 +1,40 @@
+"""
+The cluster and user activity that the tests of several modules simulate, and
+helpers to make activity and compare simulations with.
+"""
+
+import numpy as np
+
+# A cluster of up to 4 nodes for a dozen users active in blocks of 6 minutes.
+configurations = {
+    "min_nodes": 1,
+    "max_nodes": 4,
+    "node_memory": 4.6,
+    "user_pod_memory": 1.498,
+    "cost_per_month": 12.8,
+    "pod_inactivity_time": 3,
+    "pod_max_lifetime": 25,
+    "node_stop_time": 8,
+}
+
+user_activity = np.repeat(np.random.RandomState(0).rand(12, 40) < 0.3, 6, axis=1)
+
+
+def random_user_activity(seed, users=12, minutes=180):
+    """
+    Returns activity in blocks of a few minutes, like users working for a while,
+    as a list of lists.
+    """
+    random_state = np.random.RandomState(seed)
+    blocks = random_state.rand(users, minutes // 6 + 1) < 0.3
+    return np.repeat(blocks, 6, axis=1)[:, :minutes].astype(int).tolist()
+
+
+def assert_same_timelines(sim_a, sim_b):
+    """
+    Asserts that the nodes of two simulations have been in the same states with
+    the same utilized capacity.
+    """
+    for node_a, node_b in zip(sim_a.node_pool, sim_b.node_pool):
+        assert np.array_equal(node_a.utilized_capacity, node_b.utilized_capacity)
+        assert np.array_equal(node_a.started_state, node_b.started_state)
@@ -0,0 +1,101 @@
+import pytest
+import numpy as np
+
+from ..activity import (
+    ActivityIntervals,
+    activity_runs,
+    as_activity_matrix,
+    next_active_minute,
+    next_idle_deadline,
+)
+
+
+def test_as_activity_matrix():
+    matrix = as_activity_matrix([np.array([0.0, 1.0, 1.0]), [1, 0, 0]])
+    assert matrix.dtype == np.uint8
+    assert matrix.tolist() == [[0, 1, 1], [1, 0, 0]]
+
+    assert as_activity_matrix(np.array([[True, False]])).tolist() == [[1, 0]]
+    # A uint8 matrix is used without a copy.
+    assert as_activity_matrix(matrix) is matrix
+    # Unless it has other values than 0's and 1's.
+    assert as_activity_matrix(matrix * 2).tolist() == [[0, 1, 1], [1, 0, 0]]
+
+    with pytest.raises(ValueError):
+        as_activity_matrix(np.zeros(3))
+
+
+def test_activity_runs():
+    starts, ends = activity_runs([1, 1, 0, 0, 1, 0, 1, 1])
+
+    assert list(starts) == [0, 4, 6]
+    assert list(ends) == [2, 5, 8]
+
+
+def test_next_active_minute():
+    starts, ends = activity_runs([0, 1, 1, 0, 0, 1, 0])
+
+    assert next_active_minute(starts, ends, 0) == 1
+    assert next_active_minute(starts, ends, 2) == 2
+    assert next_active_minute(starts, ends, 3) == 5
+    assert next_active_minute(starts, ends, 6) is None
+
+
+def test_next_idle_deadline_matches_culler():
+    # The deadline is the first minute where the culler's check would cull the pod.
+    random_state = np.random.RandomState(0)
+    for i in range(50):
+        activity = (random_state.rand(60) < 0.3).astype(int)
+        starts, ends = activity_runs(activity)
+        for window in [1, 3, 5]:
+            for time in range(60):
+                deadline = next_idle_deadline(starts, ends, time, window)
+                expected = next(
+                    (
+                        t
+                        for t in range(time, 60)
+                        if t >= window and np.sum(activity[t - window : t + 1]) == 0
+                    ),
+                    None,
+                )
+                if expected is None:
+                    assert deadline >= 60
+                else:
+                    assert deadline == expected
+
+
+def test_activity_intervals_from_matrix():
+    matrix = (np.random.RandomState(0).rand(6, 30) < 0.4).view(np.uint8)
+    intervals = ActivityIntervals.from_matrix(matrix)
+
+    assert intervals.shape == (6, 30)
+    assert np.array_equal(intervals.to_matrix(), matrix)
+    for index in range(6):
+        starts, ends = intervals.runs(index)
+        expected_starts, expected_ends = activity_runs(matrix[index])
+        assert list(starts) == list(expected_starts)
+        assert list(ends) == list(expected_ends)
+        assert np.array_equal(intervals[index], matrix[index])
+
+    # Minute by minute, the changes lead from one minute's active users to the next.
+    for time in range(1, 31):
+        starting, ending = intervals.changes(time)
+        active = intervals.active_users(time - 1)
+        active[ending] = False
+        active[starting] = True
+        expected = matrix[:, time] == 1 if time < 30 else np.zeros(6, dtype=bool)
+        assert np.array_equal(active, expected)
+
+    hourly = ActivityIntervals.from_matrix([[0, 1, 1, 0]], scale=60)
+    assert hourly.shape == (1, 240)
+    assert list(hourly.starts) == [60] and list(hourly.ends) == [180]
+
+
+def test_activity_intervals_from_sessions():
+    intervals = ActivityIntervals.from_sessions(
+        [[(5, 8), (0, 2), (7, 9), (9, 10)], [], [(8, 20)]], length=12
+    )
+
+    assert list(intervals.offsets) == [0, 2, 2, 3]
+    assert list(intervals.starts) == [0, 5, 8]
+    assert list(intervals.ends) == [2, 10, 12]
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from ..background import BackgroundSimulation
+from ..generate_user_activity import generate_user_activity
+from ..simulator import Simulation
+from .common import configurations
+
+hourly_users = [0] * 8 + [5] * 8 + [2] * 8
+
+
+def test_progress():
+    results = []
+    background = BackgroundSimulation(
+        configurations, results.append, delay=0, chunk_minutes=500
+    )
+    background.submit(hourly_users)
+    background.wait()
+    background.shutdown()
+
+    expected = Simulation(configurations, generate_user_activity(hourly_users, seed=0))
+    expected.run()
+    assert [result["minute"] for result in results] == [500, 1000, 1440]
+    assert [result["done"] for result in results] == [False, False, True]
+    costs = [result["cost"] for result in results]
+    assert costs == sorted(costs)
+    assert costs[-1] == pytest.approx(expected.cost_breakdown()["total"])
+
+
+def test_debounce():
+    results = []
+    background = BackgroundSimulation(configurations, results.append, delay=0.2)
+    for users in range(1, 6):
+        background.submit([users] * 24)
+    background.wait()
+    background.shutdown()
+
+    assert len(results) == 1
+    assert results[0]["simulation"].user_activity.shape[0] == 5
+
+
+def test_abandon_stale():
+    results = []
+    started = threading.Event()
+    resume = threading.Event()
+
+    def callback(result):
+        results.append(result)
+        started.set()
+        resume.wait()
+
+    background = BackgroundSimulation(
+        configurations, callback, delay=0, chunk_minutes=60
+    )
+    background.submit([3] * 24)
+    started.wait()
+    # A newer change while the first simulation is running abandons it.
+    background.submit([4] * 24)
+    resume.set()
+    background.wait()
+    background.shutdown()
+
+    assert results[0]["simulation"].user_activity.shape[0] == 3
+    assert all(
+        result["simulation"].user_activity.shape[0] == 4 for result in results[1:]
+    )
+    assert [result["minute"] for result in results[1:]] == list(range(60, 1441, 60))
+
+
+def test_cancel():
+    results = []
+    background = BackgroundSimulation(configurations, results.append, delay=0.1)
+    background.submit(hourly_users)
+    background.cancel()
+    background.wait()
+    background.shutdown()
+    assert results == []
+
+
+def test_error_callback():
+    errors = []
+    background = BackgroundSimulation(
+        {"min_nodes": 1}, lambda result: None, delay=0, error_callback=errors.append
+    )
+    background.submit(hourly_users)
+    with pytest.raises(KeyError):
+        background.wait()
+    background.shutdown()
+    assert len(errors) == 1 and isinstance(errors[0], KeyError)
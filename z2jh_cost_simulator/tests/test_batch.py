@@ -0,0 +1,111 @@
+import pytest
+import numpy as np
+
+from ..activity import ActivityIntervals
+from ..batch import run_batch, run_batch_summary, simulate_batch
+from ..scheduler import LeastUtilizedScheduler, MostUtilizedScheduler
+from ..simulator import Simulation
+from ..sweep import configuration_grid
+from .common import configurations, user_activity
+
+grid = configuration_grid(
+    configurations,
+    max_nodes=[2, 4, 6],
+    node_memory=[4.6, 8],
+    pod_inactivity_time=[0, 3],
+    pod_max_lifetime=[0, 25],
+    node_stop_time=[0, 8],
+)
+
+
+def assert_same_simulation(sim, expected):
+    assert np.array_equal(sim.node_states(), expected.node_states())
+    assert np.array_equal(sim.node_utilization(), expected.node_utilization())
+    assert np.array_equal(sim.user_pool.pod_node, expected.user_pool.pod_node)
+    for node, expected_node in zip(sim.node_pool, expected.node_pool):
+        assert [pod.index for pod in node.list_pods] == [
+            pod.index for pod in expected_node.list_pods
+        ]
+    assert sim.start_time == expected.start_time
+
+
+@pytest.mark.parametrize("scheduler", [MostUtilizedScheduler, LeastUtilizedScheduler])
+def test_simulate_batch(scheduler):
+    sims = simulate_batch(grid, user_activity, scheduler=scheduler())
+    assert len(sims) == len(grid)
+    for configuration, sim in zip(grid, sims):
+        expected = Simulation(configuration, user_activity, scheduler=scheduler())
+        expected.run()
+        assert sim.configurations == configuration
+        assert_same_simulation(sim, expected)
+
+
+def test_run_batch_continues():
+    sims = [Simulation(configuration, user_activity) for configuration in grid]
+    expected_sims = [Simulation(configuration, user_activity) for configuration in grid]
+    for sim, expected in zip(sims, expected_sims):
+        sim.run(50)
+        expected.run(engine="event")
+
+    run_batch(sims, 120)
+    run_batch(sims)
+    for sim, expected in zip(sims, expected_sims):
+        assert_same_simulation(sim, expected)
+
+
+def test_run_batch_intervals():
+    sims = simulate_batch(grid[:4], ActivityIntervals.from_matrix(user_activity))
+    for configuration, sim in zip(grid, sims):
+        expected = Simulation(configuration, user_activity)
+        expected.run()
+        assert_same_simulation(sim, expected)
+
+
+def test_run_batch_other_scheduler():
+    class FirstNodeScheduler(MostUtilizedScheduler):
+        pass
+
+    sims = [Simulation(c, user_activity, FirstNodeScheduler()) for c in grid[:2]]
+    run_batch(sims)
+    for sim in sims:
+        expected = Simulation(sim.configurations, user_activity)
+        expected.run()
+        assert_same_simulation(sim, expected)
+
+
+def test_run_batch_different_start():
+    sims = [Simulation(configuration, user_activity) for configuration in grid[:2]]
+    sims[0].run(10)
+    with pytest.raises(ValueError):
+        run_batch(sims)
+
+
+def test_run_batch_different_activity():
+    other_activity = user_activity[::-1]
+    sims = [
+        Simulation(configurations, user_activity),
+        Simulation(configurations, other_activity),
+    ]
+    with pytest.raises(ValueError):
+        run_batch(sims)
+
+    # The same activity in separate arrays is simulated together.
+    sims = [
+        Simulation(configurations, user_activity),
+        Simulation(configurations, user_activity.copy()),
+    ]
+    run_batch(sims)
+    expected = Simulation(configurations, user_activity)
+    expected.run()
+    for sim in sims:
+        assert_same_simulation(sim, expected)
+
+
+def test_run_batch_summary():
+    results = run_batch_summary(grid[:3], user_activity)
+    assert list(results["configuration"]) == [0, 1, 2]
+    assert list(results["max_nodes"]) == [c["max_nodes"] for c in grid[:3]]
+    for configuration, row in zip(grid, results.itertuples()):
+        sim = Simulation(configuration, user_activity)
+        sim.run()
+        assert row.total_cost == pytest.approx(sim.summary()["total_cost"])
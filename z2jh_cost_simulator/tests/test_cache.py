@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+
+from ..activity import ActivityIntervals
+from ..cache import SimulationCache, activity_fingerprint, configuration_key
+from ..scheduler import LeastUtilizedScheduler
+from ..simulator import Simulation
+from .common import configurations, user_activity
+
+
+def test_activity_fingerprint():
+    fingerprint = activity_fingerprint(user_activity)
+    assert fingerprint == activity_fingerprint(user_activity.astype(np.uint8))
+    assert fingerprint == activity_fingerprint(list(user_activity))
+    changed = user_activity.copy()
+    changed[5, 100] = not changed[5, 100]
+    assert fingerprint != activity_fingerprint(changed)
+    assert fingerprint != activity_fingerprint(user_activity[:, :-1])
+    intervals = ActivityIntervals.from_matrix(user_activity)
+    assert activity_fingerprint(intervals) == activity_fingerprint(
+        ActivityIntervals.from_matrix(user_activity)
+    )
+
+
+def test_configuration_key():
+    key = configuration_key(configurations)
+    assert key == configuration_key(dict(reversed(list(configurations.items()))))
+    assert key != configuration_key(dict(configurations, pod_max_lifetime=26))
+    assert key != configuration_key(configurations, LeastUtilizedScheduler())
+
+
+def test_simulate():
+    expected = Simulation(configurations, user_activity)
+    expected.run()
+
+    cache = SimulationCache()
+    for engine in ["event", "tick"]:
+        sim = cache.simulate(configurations, user_activity, engine=engine)
+        assert np.array_equal(sim.node_states(), expected.node_states())
+        assert np.array_equal(sim.node_utilization(), expected.node_utilization())
+        assert sim.summary() == expected.summary()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.simulate(configurations, user_activity, scheduler=LeastUtilizedScheduler())
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used():
+    cache = SimulationCache(maxsize=2)
+    for pod_max_lifetime in [10, 20, 10, 30, 10, 20]:
+        cache.simulate(
+            dict(configurations, pod_max_lifetime=pod_max_lifetime), user_activity
+        )
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_directory(tmp_path):
+    directory = str(tmp_path / "cache")
+    cache = SimulationCache(directory=directory)
+    expected = cache.simulate(configurations, user_activity)
+
+    cache = SimulationCache(directory=directory)
+    sim = cache.simulate(configurations, user_activity)
+    assert cache.hits == 1
+    assert sim.summary() == expected.summary()
+
+    cache.clear()
+    assert os.listdir(directory) == []
+    assert len(cache) == 0
+
+
+def test_directory_max_bytes(tmp_path):
+    directory = str(tmp_path / "cache")
+    cache = SimulationCache(directory=directory)
+    cache.simulate(configurations, user_activity)
+    size = os.path.getsize(os.path.join(directory, os.listdir(directory)[0]))
+
+    cache = SimulationCache(maxsize=0, directory=directory, max_bytes=3 * size)
+    for pod_max_lifetime in range(10, 16):
+        cache.simulate(
+            dict(configurations, pod_max_lifetime=pod_max_lifetime), user_activity
+        )
+    assert len(os.listdir(directory)) > 0
+    assert (
+        sum(
+            os.path.getsize(os.path.join(directory, name))
+            for name in os.listdir(directory)
+        )
+        <= 3 * size
+    )
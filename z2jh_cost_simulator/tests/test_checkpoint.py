@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+
+from ..checkpoint import Checkpoint
+from ..simulator import Simulation
+from .common import configurations, user_activity
+
+
+def assert_same_run(sim, expected):
+    assert np.array_equal(sim.node_states(), expected.node_states())
+    assert np.array_equal(sim.node_utilization(), expected.node_utilization())
+
+
+@pytest.mark.parametrize("engine", ["tick", "event"])
+def test_fork_continues_simulation(engine):
+    expected = Simulation(configurations, user_activity)
+    expected.run(engine=engine)
+
+    sim = Simulation(configurations, user_activity)
+    sim.run(100, engine=engine)
+    forked = sim.fork()
+    forked.run(engine=engine)
+    assert_same_run(forked, expected)
+    assert sim.start_time == 100
+
+
+@pytest.mark.parametrize("engine", ["tick", "event"])
+def test_fork_with_changed_configurations(engine):
+    changes = {"pod_max_lifetime": 60, "node_stop_time": 3, "max_nodes": 6}
+    expected = Simulation(configurations, user_activity)
+    expected.run(100, engine=engine)
+    expected.configurations = dict(configurations, **changes)
+    expected._add_nodes()
+    expected.run(engine=engine)
+
+    sim = Simulation(configurations, user_activity)
+    sim.run(100, engine=engine)
+    before = sim.node_utilization()
+    forked = sim.fork(**changes)
+    forked.run(engine=engine)
+    assert_same_run(forked, expected)
+    assert len(forked.node_pool) == 5
+    # The forked simulation doesn't change the one it was forked from.
+    assert np.array_equal(sim.node_utilization(), before)
+
+
+def test_fork_fewer_nodes():
+    sim = Simulation(configurations, user_activity)
+    sim.run(100)
+    with pytest.raises(ValueError):
+        sim.fork(max_nodes=2)
+    with pytest.raises(ValueError):
+        sim.fork(user_pod_memory=1)
+
+
+def test_restore():
+    expected = Simulation(configurations, user_activity)
+    expected.run()
+
+    sim = Simulation(configurations, user_activity)
+    sim.run(60)
+    checkpoint = sim.checkpoint()
+    sim.run(180)
+    sim.restore(checkpoint)
+    assert sim.start_time == 60
+    sim.run()
+    assert_same_run(sim, expected)
+
+
+def test_save_and_load(tmp_path):
+    expected = Simulation(configurations, user_activity)
+    expected.run()
+
+    sim = Simulation(configurations, user_activity)
+    sim.run(150)
+    path = str(tmp_path / "checkpoint.npz")
+    sim.checkpoint().save(path)
+
+    checkpoint = Checkpoint.load(path)
+    assert checkpoint.configurations == configurations
+    restored = Simulation(configurations, user_activity)
+    restored.restore(checkpoint)
+    restored.run(engine="event")
+    assert_same_run(restored, expected)
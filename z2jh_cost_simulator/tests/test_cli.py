@@ -0,0 +1,159 @@
+import json
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from .. import cli
+from ..cli import main, read_activity, simulate_files, utilization_table
+from ..generate_user_activity import generate_user_activity
+from ..resolution import coarsen_activity
+from ..simulator import Simulation
+from ..trace import write_trace
+from .common import configurations
+
+hourly_users = [2, 5, 3, 6, 1]
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    configurations_path = tmp_path / "configurations.json"
+    configurations_path.write_text(
+        json.dumps([configurations, dict(configurations, max_nodes=5)])
+    )
+    curve_path = tmp_path / "curve.json"
+    curve_path.write_text(json.dumps(hourly_users))
+    trace_path = tmp_path / "trace.bin"
+    write_trace(str(trace_path), generate_user_activity(hourly_users, seed=1))
+    return str(configurations_path), str(curve_path), str(trace_path)
+
+
+def test_read_activity(inputs, tmp_path):
+    _, curve_path, trace_path = inputs
+    expected = generate_user_activity(hourly_users, seed=0)
+    assert np.array_equal(read_activity(curve_path, seed=0), expected)
+    text_path = tmp_path / "curve.csv"
+    text_path.write_text("2, 5,3\n6\n1\n")
+    assert np.array_equal(read_activity(str(text_path), seed=0), expected)
+
+    activity = generate_user_activity(hourly_users, seed=1)
+    assert np.array_equal(read_activity(trace_path), activity)
+    assert np.array_equal(
+        read_activity(trace_path, tick_minutes=5), coarsen_activity(activity, 5)
+    )
+
+    # A trace of hours is simulated with ticks of an hour.
+    hourly_path = str(tmp_path / "hourly.bin")
+    write_trace(hourly_path, activity[:, ::60], resolution=3600)
+    assert np.array_equal(
+        read_activity(hourly_path, tick_minutes=60), activity[:, ::60]
+    )
+    with pytest.raises(ValueError):
+        read_activity(hourly_path)
+
+
+def test_utilization_table():
+    sim = Simulation(configurations, generate_user_activity(hourly_users, seed=0))
+    sim.run()
+    table = utilization_table(sim)
+    assert list(table.columns) == [
+        "time",
+        "node",
+        "state",
+        "utilized_capacity",
+        "utilized_percent",
+    ]
+    assert np.array_equal(table["state"], sim.node_states().ravel())
+    assert np.array_equal(table["utilized_capacity"], sim.node_utilization().ravel())
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_simulate_files(inputs, tmp_path, processes):
+    configurations_path, curve_path, trace_path = inputs
+    output = tmp_path / "results"
+    runs = simulate_files(
+        cli.read_configurations(configurations_path),
+        [curve_path, trace_path],
+        str(output),
+        file_format="csv",
+        processes=processes,
+    )
+    assert list(runs["activity"]) == ["curve", "curve", "trace", "trace"]
+    assert list(runs["configuration"]) == [0, 1, 0, 1]
+    assert pd.read_csv(str(output / "runs.csv")).shape == runs.shape
+
+    sim = Simulation(
+        dict(configurations, max_nodes=5), generate_user_activity(hourly_users, seed=1)
+    )
+    sim.run()
+    assert runs["total_cost"][3] == pytest.approx(sim.summary()["total_cost"])
+    partition = "activity=trace/configuration=1/part-0.csv"
+    utilization = pd.read_csv(str(output / "utilization" / partition))
+    assert np.array_equal(utilization["state"], sim.node_states().ravel())
+    hourly_cost = pd.read_csv(str(output / "hourly_cost" / partition))
+    assert list(hourly_cost.columns) == ["hour", "cost"]
+    assert hourly_cost["cost"].sum() == pytest.approx(runs["total_cost"][3])
+
+
+def test_simulate_files_same_names(inputs, tmp_path):
+    configurations_path, curve_path, _ = inputs
+    other_path = tmp_path / "other"
+    other_path.mkdir()
+    (other_path / "curve.json").write_text(json.dumps(hourly_users))
+    with pytest.raises(ValueError):
+        simulate_files(
+            [configurations],
+            [curve_path, str(other_path / "curve.json")],
+            str(tmp_path / "results"),
+            file_format="csv",
+            processes=1,
+        )
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_main_columnar(inputs, tmp_path, file_format):
+    pytest.importorskip("pyarrow")
+    configurations_path, curve_path, trace_path = inputs
+    output = tmp_path / "results"
+    main(
+        [
+            configurations_path,
+            curve_path,
+            trace_path,
+            "--output",
+            str(output),
+            "--format",
+            file_format,
+            "--processes",
+            "1",
+        ]
+    )
+    extension = cli._EXTENSIONS[file_format]
+    read = pd.read_parquet if file_format == "parquet" else pd.read_feather
+    assert len(read(str(output / ("runs" + extension)))) == 4
+    utilization = read(
+        str(output / "utilization/activity=curve/configuration=0/part-0" + extension)
+    )
+    assert "utilized_capacity" in utilization
+
+
+def test_main_without_pyarrow(inputs, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(cli, "pyarrow", None)
+    configurations_path, curve_path, _ = inputs
+    with pytest.raises(SystemExit):
+        main([configurations_path, curve_path, "--output", str(tmp_path)])
+    assert "pyarrow" in capsys.readouterr().err
+
+    main(
+        [
+            configurations_path,
+            curve_path,
+            "--output",
+            str(tmp_path / "results"),
+            "--format",
+            "csv",
+            "--processes",
+            "1",
+        ]
+    )
+    assert "Simulated 2 runs" in capsys.readouterr().out
@@ -0,0 +1,57 @@
+import pytest
+import numpy as np
+
+from ..downsample import aggregate, lttb
+from ..simulator import Simulation
+from .common import configurations, user_activity
+
+
+def test_aggregate():
+    values = np.array([[1, 5, 3, 2, 8, 0, 4], [0, 0, 1, 1, 1, 1, 2]])
+    minimum, mean, maximum = aggregate(values, 3)
+    assert np.array_equal(minimum, [[1, 0, 4], [0, 1, 2]])
+    assert np.allclose(mean, [[3, 10 / 3, 4], [1 / 3, 1, 2]])
+    assert np.array_equal(maximum, [[5, 8, 4], [1, 1, 2]])
+
+    minimum, mean, maximum = aggregate(np.zeros((2, 0)), 5)
+    assert minimum.shape == mean.shape == maximum.shape == (2, 0)
+
+
+def test_lttb():
+    x = np.arange(1000)
+    y = np.sin(x / 50) + (x == 123) * 5
+
+    indices = lttb(x, y, 100)
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+    # The spike is kept.
+    assert 123 in indices
+
+    assert np.array_equal(lttb(x[:10], y[:10], 100), np.arange(10))
+    assert np.array_equal(lttb(x, y, 2), [0, 999])
+    with pytest.raises(ValueError):
+        lttb(x, y, 1)
+
+
+def test_utilization_pyramid():
+    sim = Simulation(configurations, user_activity)
+    sim.run()
+    utilization_data = sim.create_utilization_data()
+
+    pyramid = sim.utilization_pyramid(levels=(1, 60))
+    assert set(pyramid) == {1, 60}
+    minutes = pyramid[1]
+    assert np.array_equal(minutes["time"], utilization_data["time"])
+    for statistic in ["min", "mean", "max"]:
+        assert np.array_equal(
+            minutes["node0_utilized_percent_" + statistic],
+            utilization_data["node0_utilized_percent"],
+        )
+
+    hours = pyramid[60]
+    assert list(hours["time"]) == [0, 60, 120, 180]
+    percent = np.reshape(utilization_data["node1_utilized_percent"].to_numpy(), (4, 60))
+    assert np.allclose(hours["node1_utilized_percent_min"], percent.min(axis=1))
+    assert np.allclose(hours["node1_utilized_percent_mean"], percent.mean(axis=1))
+    assert np.allclose(hours["node1_utilized_percent_max"], percent.max(axis=1))
@@ -0,0 +1,99 @@
+import pytest
+import numpy as np
+
+from ..activity import ActivityIntervals
+from ..estimate import estimate, pod_counts, pod_intervals
+from ..scheduler import LeastUtilizedScheduler
+from ..simulator import Simulation
+from . import common
+from .common import user_activity
+
+configurations = dict(common.configurations, max_nodes=8)
+
+
+@pytest.mark.parametrize(
+    "culling",
+    [
+        {"pod_inactivity_time": 3, "pod_max_lifetime": 25},
+        {"pod_inactivity_time": 0, "pod_max_lifetime": 7},
+        {"pod_inactivity_time": 20, "pod_max_lifetime": 0},
+        {"pod_inactivity_time": 0, "pod_max_lifetime": 0},
+    ],
+)
+def test_pod_intervals(culling):
+    settings = dict(configurations, **culling)
+    sim = Simulation(settings, user_activity)
+    sim.run()
+
+    users, starts, stops = pod_intervals(settings, user_activity)
+    assert np.all(starts < stops)
+    assert np.array_equal(
+        pod_counts(starts, stops, user_activity.shape[1]),
+        np.sum(sim.node_utilization(), axis=0),
+    )
+    intervals = ActivityIntervals.from_matrix(user_activity)
+    for expected, result in zip(
+        (users, starts, stops), pod_intervals(settings, intervals)
+    ):
+        assert np.array_equal(expected, result)
+
+
+def test_pod_intervals_without_activity():
+    users, starts, stops = pod_intervals(configurations, np.zeros((3, 10)))
+    assert len(users) == len(starts) == len(stops) == 0
+    assert np.array_equal(pod_counts(starts, stops, 10), np.zeros(10))
+
+
+@pytest.mark.parametrize("node_stop_time", [0, 8, 30])
+def test_estimate_closed_form(node_stop_time):
+    settings = dict(configurations, node_stop_time=node_stop_time)
+    sim = Simulation(settings, user_activity)
+    sim.run()
+    expected = sim.summary()
+
+    result = estimate(settings, user_activity)
+    assert result.pop("method") == "closed-form"
+    assert result.pop("peak_pods") == expected["peak_pods"]
+    # The closed form only gives bounds of the other numbers of a simulation.
+    assert result.pop("peak_nodes_lower_bound") <= expected["peak_nodes"]
+    assert result.pop("node_hours_lower_bound") <= expected["node_hours"]
+    assert result.pop("total_cost_lower_bound") <= expected["total_cost"]
+    assert result.pop("mean_utilization_upper_bound") >= expected["mean_utilization"]
+    assert result == {}
+
+
+def test_estimate_culled_while_full():
+    # The pods of the first two users fill the node until they are culled in
+    # minute 3, after the pod of the third user couldn't be scheduled in it.
+    settings = dict(
+        configurations,
+        max_nodes=2,
+        node_memory=2.216,
+        user_pod_memory=1,
+        pod_inactivity_time=2,
+        pod_max_lifetime=0,
+    )
+    activity = np.array([[1, 0, 0, 0, 0, 0], [1, 0, 0, 0, 0, 0], [0, 0, 0, 1, 1, 0]])
+    sim = Simulation(settings, activity)
+    sim.run()
+    assert sim.user_pool.pod_start_time[2] == 4
+
+    result = estimate(settings, activity)
+    assert result.pop("method") == "simulation"
+    assert result == sim.summary()
+
+
+@pytest.mark.parametrize(
+    "settings, scheduler",
+    [
+        (dict(configurations, max_nodes=3), None),
+        (configurations, LeastUtilizedScheduler()),
+    ],
+)
+def test_estimate_simulation(settings, scheduler):
+    sim = Simulation(settings, user_activity, scheduler=scheduler)
+    sim.run()
+
+    result = estimate(settings, user_activity, scheduler=scheduler)
+    assert result.pop("method") == "simulation"
+    assert result == sim.summary()
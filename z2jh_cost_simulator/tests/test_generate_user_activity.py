@@ -1,7 +1,10 @@
 import pytest
 import numpy as np
 
-from ..generate_user_activity import generate_user_activity
+from ..generate_user_activity import (
+    generate_hourly_user_activity,
+    generate_user_activity,
+)
 
 
 def test_no_users():
@@ -94,3 +97,46 @@ def test_same_no_of_users():
         ]
     )
     assert number_of_users_active_in_the_fourth_hour == 4
+
+
+def test_hourly_user_activity():
+    hour_wise_simultaneous_users = [2, 3, 4, 2, 5, 1]
+
+    hourly_activity = generate_hourly_user_activity(
+        hour_wise_simultaneous_users, seed=0
+    )
+    assert hourly_activity.shape == (5, 6)
+    assert list(np.sum(hourly_activity, axis=0)) == hour_wise_simultaneous_users
+    # Users only become active once the number of simultaneous users needs them.
+    assert not np.any(hourly_activity[2:, 0])
+    assert not np.any(hourly_activity[4, :4])
+
+    # The same seed gives the same activity.
+    assert np.array_equal(
+        hourly_activity,
+        generate_hourly_user_activity(hour_wise_simultaneous_users, seed=0),
+    )
+
+
+def test_hourly_user_activity_replicas():
+    hourly_activity = generate_hourly_user_activity([2, 3, 1], replicas=4, seed=0)
+
+    assert hourly_activity.shape == (4, 3, 3)
+    assert np.all(np.sum(hourly_activity, axis=1) == [2, 3, 1])
+
+
+def test_user_activity_matrix():
+    user_activities = generate_user_activity([2, 3, 1], seed=0)
+
+    assert user_activities.dtype == np.uint8
+    assert user_activities.shape == (3, 3 * 60)
+    assert np.array_equal(user_activities, generate_user_activity([2, 3, 1], seed=0))
+
+
+def test_user_activity_intervals():
+    intervals = generate_user_activity([2, 3, 1], seed=0, intervals=True)
+
+    assert intervals.shape == (3, 3 * 60)
+    assert np.array_equal(
+        intervals.to_matrix(), generate_user_activity([2, 3, 1], seed=0)
+    )
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from ..instrumentation import Instrumentation
+from ..simulator import Simulation
+from .common import configurations, random_user_activity
+
+phases = ["create_pods", "schedule_pods", "start_nodes", "stop_nodes", "cull_pods"]
+
+
+def test_instrumentation():
+    user_activity = random_user_activity(seed=0)
+    results = {}
+    for engine in ["tick", "event"]:
+        instrumentation = Instrumentation()
+        sim = Simulation(configurations, user_activity, instrumentation=instrumentation)
+        sim.run(engine=engine)
+        results[engine] = instrumentation.to_dict()
+
+    assert list(results["tick"]) == phases
+    assert all(results["tick"][phase]["calls"] == 180 for phase in phases)
+    # The event engine visits fewer minutes, but changes the same pods and nodes.
+    for phase in phases:
+        assert results["event"][phase]["calls"] < 180
+        assert results["event"][phase]["count"] == results["tick"][phase]["count"]
+    created = results["tick"]["create_pods"]["count"]
+    assert created > 0
+    assert results["tick"]["schedule_pods"]["count"] == created
+
+    phase_data = instrumentation.to_dataframe()
+    assert list(phase_data.index) == phases
+    assert phase_data["time_share"].sum() == pytest.approx(1)
+
+
+def test_chrome_trace(tmp_path):
+    instrumentation = Instrumentation(trace=True)
+    sim = Simulation(configurations, [[0, 1, 1]], instrumentation=instrumentation)
+    sim.run()
+
+    path = str(tmp_path / "trace.json")
+    instrumentation.to_chrome_trace(path)
+    with open(path) as f:
+        events = json.load(f)["traceEvents"]
+    assert len(events) == 3 * len(phases)
+    assert events[0]["name"] == "create_pods"
+    assert events[0]["ph"] == "X"
+    assert events[-1]["args"]["minute"] == 2
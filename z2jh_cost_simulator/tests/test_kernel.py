@@ -0,0 +1,93 @@
+import inspect
+
+import pytest
+import numpy as np
+
+from . import test_simulator
+from .. import simulator
+from ..activity import ActivityIntervals
+from ..kernel import compiled_tick_kernel, tick_kernel
+from ..scheduler import LeastUtilizedScheduler
+from ..simulator import Simulation
+from .common import assert_same_timelines, configurations, random_user_activity
+
+kernels = [
+    tick_kernel,
+    pytest.param(
+        compiled_tick_kernel,
+        marks=pytest.mark.skipif(
+            compiled_tick_kernel is None, reason="numba isn't installed"
+        ),
+    ),
+]
+
+
+@pytest.fixture(params=kernels, ids=["python", "numba"])
+def kernel_backend(request, monkeypatch):
+    # Run simulations with the kernel by default, also without numba.
+    monkeypatch.setattr(simulator, "compiled_tick_kernel", request.param)
+    run = Simulation.run
+
+    def run_with_kernel(self, stop=0, engine="tick", backend="numba"):
+        return run(self, stop=stop, engine=engine, backend=backend)
+
+    monkeypatch.setattr(Simulation, "run", run_with_kernel)
+
+
+@pytest.mark.parametrize(
+    "test",
+    [
+        getattr(test_simulator, name)
+        for name in dir(test_simulator)
+        if name.startswith("test_")
+        and not inspect.signature(getattr(test_simulator, name)).parameters
+    ],
+    ids=lambda test: test.__name__,
+)
+def test_simulator_tests_with_kernel(test, kernel_backend):
+    test()
+
+
+@pytest.mark.parametrize("scheduler", [None, LeastUtilizedScheduler])
+def test_kernel_matches_engines(scheduler, kernel_backend):
+    for seed in range(5):
+        user_activity = random_user_activity(seed, users=20)
+        engine_sim = Simulation(
+            configurations, user_activity, scheduler and scheduler()
+        )
+        kernel_sim = Simulation(
+            configurations,
+            ActivityIntervals.from_matrix(user_activity),
+            scheduler and scheduler(),
+        )
+
+        engine_sim.run(backend="python")
+        kernel_sim.run(stop=40)
+        kernel_sim.run(stop=90, engine="event", backend="python")
+        kernel_sim.run()
+        assert_same_timelines(engine_sim, kernel_sim)
+        assert np.array_equal(
+            engine_sim.user_pool.has_pod, kernel_sim.user_pool.has_pod
+        )
+        assert np.array_equal(
+            engine_sim.user_pool.pod_node, kernel_sim.user_pool.pod_node
+        )
+
+
+def test_unknown_backend():
+    sim = Simulation(configurations=configurations, user_activity=[[0, 1, 1]])
+
+    with pytest.raises(ValueError):
+        sim.run(backend="unknown")
+
+
+def test_numba_backend_falls_back():
+    # Without numba, or with a scheduler the kernel doesn't implement, the
+    # engines are used.
+    user_activity = random_user_activity(seed=1)
+    sim = Simulation(configurations, user_activity)
+    expected_sim = Simulation(configurations, user_activity)
+
+    sim.run(backend="numba")
+    expected_sim.run()
+    assert_same_timelines(sim, expected_sim)
@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+
+from .. import monte_carlo
+from ..monte_carlo import run_monte_carlo
+from . import common
+
+configurations = dict(common.configurations, min_nodes=0, pod_inactivity_time=10)
+
+hour_wise_simultaneous_users = [0, 2, 5, 8, 3, 0]
+
+
+def test_run_monte_carlo():
+    results = run_monte_carlo(
+        configurations, hour_wise_simultaneous_users, replicas=8, processes=2
+    )
+
+    replicas = results["replicas"]
+    assert list(replicas["replica"]) == list(range(8))
+    # Eight users need three nodes of capacity three at the peak.
+    assert np.all(replicas["peak_nodes"] == 3)
+
+    summary = results["summary"]
+    assert summary["total_cost"]["mean"] == pytest.approx(replicas["total_cost"].mean())
+    assert (
+        summary["total_cost"]["mean_ci_low"]
+        <= summary["total_cost"]["mean"]
+        <= summary["total_cost"]["mean_ci_high"]
+    )
+    assert summary["total_cost"]["p90"] >= summary["total_cost"]["p50"]
+
+
+def test_run_monte_carlo_is_reproducible():
+    in_process = run_monte_carlo(
+        configurations, hour_wise_simultaneous_users, replicas=4, processes=1
+    )
+    in_workers = run_monte_carlo(
+        configurations, hour_wise_simultaneous_users, replicas=4, processes=2
+    )
+
+    assert in_process["replicas"].equals(in_workers["replicas"])
+    # The configurations aren't kept by the module after the in-process run.
+    assert monte_carlo._worker_configurations is None
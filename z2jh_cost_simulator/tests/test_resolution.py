@@ -0,0 +1,132 @@
+import pytest
+import numpy as np
+
+from .. import simulator
+from ..batch import simulate_batch
+from ..generate_user_activity import generate_user_activity
+from ..kernel import compiled_tick_kernel, tick_kernel
+from ..resolution import coarsen_activity, resolution_report
+from ..simulator import Simulation, time_settings
+from . import common
+
+configurations = dict(
+    common.configurations, pod_inactivity_time=12, pod_max_lifetime=120
+)
+
+user_activity = np.repeat(np.random.RandomState(0).rand(12, 40) < 0.3, 30, axis=1)
+
+
+def test_time_settings():
+    settings = time_settings(configurations)
+    assert settings == {
+        "tick_minutes": 1,
+        "pod_inactivity_time": 12,
+        "pod_max_lifetime": 120,
+        "node_stop_time": 8,
+        "node_start_time": 5,
+    }
+
+    settings = time_settings(
+        dict(configurations, tick_minutes=5, pod_inactivity_time=2)
+    )
+    assert settings["tick_minutes"] == 5
+    # Settings are rounded to whole ticks, and are at least a tick unless 0.
+    assert settings["pod_inactivity_time"] == 1
+    assert settings["pod_max_lifetime"] == 24
+    assert settings["node_stop_time"] == 2
+    assert settings["node_start_time"] == 1
+
+    settings = time_settings(dict(configurations, tick_minutes=5, node_stop_time=2))
+    assert settings["node_stop_time"] == 1
+    settings = time_settings(dict(configurations, tick_minutes=15, node_stop_time=0))
+    assert settings["node_stop_time"] == 0
+
+
+def test_tick_of_a_minute():
+    sim = Simulation(configurations, user_activity)
+    sim.run()
+    tick_sim = Simulation(dict(configurations, tick_minutes=1), user_activity)
+    tick_sim.run()
+    assert np.array_equal(sim.node_states(), tick_sim.node_states())
+    assert sim.summary() == tick_sim.summary()
+
+
+@pytest.mark.parametrize(
+    "kernel",
+    [
+        tick_kernel,
+        pytest.param(
+            compiled_tick_kernel,
+            marks=pytest.mark.skipif(
+                compiled_tick_kernel is None, reason="numba isn't installed"
+            ),
+        ),
+    ],
+    ids=["python", "numba"],
+)
+def test_engines_match_with_ticks(kernel, monkeypatch):
+    monkeypatch.setattr(simulator, "compiled_tick_kernel", kernel)
+    tick_configurations = dict(configurations, tick_minutes=5, node_start_time=10)
+    activity = coarsen_activity(user_activity, 5)
+
+    expected = Simulation(tick_configurations, activity)
+    expected.run(engine="tick")
+    runs = [{"engine": "event"}, {"engine": "tick", "backend": "numba"}]
+    for run in runs:
+        sim = Simulation(tick_configurations, activity)
+        sim.run(**run)
+        assert np.array_equal(sim.node_states(), expected.node_states())
+        assert np.array_equal(sim.node_utilization(), expected.node_utilization())
+
+    (sim,) = simulate_batch([tick_configurations], activity)
+    assert np.array_equal(sim.node_states(), expected.node_states())
+    assert np.array_equal(sim.node_utilization(), expected.node_utilization())
+
+
+def test_generate_user_activity_ticks():
+    hourly_users = [3, 5, 2]
+    activity = generate_user_activity(hourly_users, seed=0, tick_minutes=15)
+    assert activity.shape == (5, 12)
+    with pytest.raises(ValueError):
+        generate_user_activity(hourly_users, seed=0, tick_minutes=7)
+
+
+def test_cost_breakdown_ticks():
+    sim = Simulation(
+        dict(configurations, tick_minutes=5), coarsen_activity(user_activity, 5)
+    )
+    sim.run()
+    costs = sim.cost_breakdown()
+    billed_ticks = np.sum(sim.node_states() != simulator.NodeState.Stopped)
+    assert costs["nodes"]["billed_hours"].sum() == pytest.approx(billed_ticks * 5 / 60)
+    # An hour is 12 ticks of 5 minutes.
+    assert len(costs["hourly_cost"]) == -(-sim.simulation_time // 12)
+    assert costs["hourly_cost"].sum() == pytest.approx(costs["total"])
+
+
+def test_coarsen_activity():
+    activity = np.array([[0, 1, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0, 1]])
+    coarse = coarsen_activity(activity, 3)
+    assert coarse.dtype == np.uint8
+    # The last tick only has a minute.
+    assert np.array_equal(coarse, [[1, 0, 0], [0, 0, 1]])
+    assert coarsen_activity(np.zeros((2, 0)), 3).shape == (2, 0)
+
+
+def test_resolution_report():
+    report = resolution_report(configurations, user_activity, ticks=(5, 15))
+    assert list(report["tick_minutes"]) == [1, 5, 15]
+    assert list(report.columns) == [
+        "tick_minutes",
+        "total_cost",
+        "node_hours",
+        "peak_nodes",
+        "cost_error",
+        "seconds",
+    ]
+    assert report["cost_error"].iloc[0] == 0
+
+    sim = Simulation(configurations, user_activity)
+    sim.run()
+    assert report["total_cost"].iloc[0] == pytest.approx(sim.summary()["total_cost"])
+    assert np.all(np.abs(report["cost_error"]) < 0.5)
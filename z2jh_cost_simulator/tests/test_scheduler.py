@@ -0,0 +1,72 @@
+import numpy as np
+
+from ..scheduler import LeastUtilizedScheduler, MostUtilizedScheduler
+from ..simulator import Node, Simulation, UserPool
+
+
+def _node_pool(*utilized_capacities, capacity=3):
+    # Nodes with some pods already scheduled, and a pool of further users.
+    node_pool = []
+    user_pool = UserPool(np.zeros((20, 10), dtype=np.uint8), node_pool)
+    users = iter(user_pool)
+    for utilized_capacity in utilized_capacities:
+        node = Node(10, capacity=capacity, index=len(node_pool))
+        for i in range(utilized_capacity):
+            node.add_pod_ref(next(users), 0)
+        node_pool.append(node)
+    return node_pool, users
+
+
+def test_most_utilized_node_with_room():
+    node_pool, users = _node_pool(1, 3, 2, 2)
+    scheduler = MostUtilizedScheduler()
+
+    # The full node is skipped, and on ties the first node is used.
+    user_pod = next(users)
+    scheduler.schedule([user_pod], node_pool, 1)
+    assert user_pod.node_assigned_to_pod is node_pool[2]
+
+
+def test_least_utilized_node_with_room():
+    node_pool, users = _node_pool(1, 0, 2, 0)
+    scheduler = LeastUtilizedScheduler()
+
+    user_pods = [next(users), next(users)]
+    scheduler.schedule(user_pods, node_pool, 1)
+    assert user_pods[0].node_assigned_to_pod is node_pool[1]
+    assert user_pods[1].node_assigned_to_pod is node_pool[3]
+
+
+def test_schedule_batch_until_full():
+    node_pool, users = _node_pool(1, 2)
+    scheduler = MostUtilizedScheduler()
+
+    user_pods = [next(users) for i in range(4)]
+    scheduled_pods = scheduler.schedule(user_pods, node_pool, 1)
+    assert scheduled_pods == user_pods[:3]
+    assert user_pods[3].pod_is_pending
+    assert [node.utilized_capacity[1] for node in node_pool] == [3, 3]
+
+    # Once a pod is removed, the node has room again.
+    node_pool[0].remove_pod_ref(user_pods[1], 2)
+    scheduler.pod_removed(node_pool[0], 2)
+    assert scheduler.schedule(user_pods[3:], node_pool, 2) == user_pods[3:]
+    assert user_pods[3].node_assigned_to_pod is node_pool[0]
+
+
+def test_simulation_with_scheduler():
+    configurations = {
+        "min_nodes": 1,
+        "max_nodes": 3,
+        "node_memory": 4.6,
+        "user_pod_memory": 1.498,
+        "pod_inactivity_time": 3,
+        "pod_max_lifetime": 7,
+        "node_stop_time": 5,
+    }
+    user_activity = [[0, 1, 1], [0, 0, 1]]
+    sim = Simulation(configurations, user_activity, scheduler=LeastUtilizedScheduler())
+
+    sim.run()
+    assert len(sim.node_pool[0].list_pods) == 1
+    assert len(sim.node_pool[1].list_pods) == 1
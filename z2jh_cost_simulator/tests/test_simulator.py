@@ -1,6 +1,9 @@
 import pytest
+import numpy as np
 
+from ..activity import ActivityIntervals
 from ..simulator import Simulation, NodeState
+from .common import assert_same_timelines, random_user_activity
 
 # Configurations
 """
@@ -18,7 +21,7 @@ configurations = {
     "node_cpu": 0.45,
     "node_memory": 4.6,
     "user_pod_cpu": 4,
-    "user_pod_memory": 1498,
+    "user_pod_memory": 1.498,
     "cost_per_month": 12.8,
     "pod_inactivity_time": 3,
     "pod_max_lifetime": 7,
@@ -214,3 +217,143 @@ def test_min_number_of_running_nodes():
     # The utilized capacity of node 2 has become zero, but it will not be 'Stopped'
     assert sim.node_pool[1].started_state[22] == NodeState.Running
     assert sim.node_pool[0].started_state[22] == NodeState.Stopped
+
+
+def test_event_engine_matches_tick_engine():
+    for seed in range(5):
+        user_activity = random_user_activity(seed)
+        tick_sim = Simulation(
+            configurations=configurations, user_activity=user_activity
+        )
+        event_sim = Simulation(
+            configurations=configurations, user_activity=user_activity
+        )
+
+        tick_sim.run()
+        event_sim.run(engine="event")
+        assert_same_timelines(tick_sim, event_sim)
+
+
+def test_engines_can_be_mixed_between_runs():
+    user_activity = random_user_activity(seed=42)
+    tick_sim = Simulation(configurations=configurations, user_activity=user_activity)
+    mixed_sim = Simulation(configurations=configurations, user_activity=user_activity)
+
+    tick_sim.run()
+    mixed_sim.run(stop=50, engine="event")
+    mixed_sim.run(stop=100, engine="tick")
+    mixed_sim.run(engine="event")
+    assert_same_timelines(tick_sim, mixed_sim)
+
+
+@pytest.mark.parametrize("engine", ["tick", "event"])
+def test_activity_intervals_match_matrix(engine):
+    for seed in range(5):
+        user_activity = random_user_activity(seed)
+        matrix_sim = Simulation(
+            configurations=configurations, user_activity=user_activity
+        )
+        intervals_sim = Simulation(
+            configurations=configurations,
+            user_activity=ActivityIntervals.from_matrix(user_activity),
+        )
+
+        matrix_sim.run()
+        intervals_sim.run(stop=70, engine=engine)
+        intervals_sim.run(engine=engine)
+        assert_same_timelines(matrix_sim, intervals_sim)
+
+
+def test_activity_values_other_than_one():
+    # Users are active in the minutes that aren't 0, with every engine.
+    user_activity = random_user_activity(seed=3)
+    expected = Simulation(configurations=configurations, user_activity=user_activity)
+    expected.run()
+    for engine in ["tick", "event"]:
+        sim = Simulation(
+            configurations=configurations,
+            user_activity=np.asarray(user_activity, dtype=np.uint8) * 2,
+        )
+        sim.run(engine=engine)
+        assert_same_timelines(expected, sim)
+
+
+def test_unknown_engine():
+    sim = Simulation(configurations=configurations, user_activity=[[0, 1, 1]])
+
+    with pytest.raises(ValueError):
+        sim.run(engine="unknown")
+
+
+def test_user_pool_arrays():
+    # The users' pod state is stored in arrays, and the users are views of them.
+    user_activity = [[0, 1, 1], [0, 0, 1]]
+    sim = Simulation(configurations=configurations, user_activity=user_activity)
+
+    sim.run(stop=3)
+    assert sim.user_activity.dtype == np.uint8
+    assert list(sim.user_pool.has_pod) == [True, True]
+    assert list(sim.user_pool.pod_node) == [0, 0]
+    assert list(sim.user_pool.pod_start_time) == [1, 2]
+    assert sim.user_pool[1].node_assigned_to_pod is sim.node_pool[0]
+    assert sim.user_pool[1] is sim.user_pool[1]
+
+
+def test_node_states_matrix():
+    user_activity = [[0, 1, 1, 1, 1, 1, 0]]
+    sim = Simulation(configurations=configurations, user_activity=user_activity)
+
+    sim.run()
+    node_states = sim.node_states()
+    assert node_states.dtype == np.int8
+    assert node_states.shape == (2, 7)
+    assert list(node_states[0]) == [0, 1, 1, 1, 1, 1, 2]
+    assert node_states[0, 6] == NodeState.Running
+    assert sim.node_pool[0].state_at(1) is NodeState.Starting
+
+
+def test_create_utilization_data():
+    user_activity = [[0, 1, 1, 0], [0, 0, 1, 0]]
+    sim = Simulation(configurations=configurations, user_activity=user_activity)
+    sim.run()
+
+    utilization_data = sim.create_utilization_data()
+    assert list(utilization_data.columns) == [
+        "time",
+        "node0_utilized_capacity",
+        "node0_utilized_percent",
+        "node1_utilized_capacity",
+        "node1_utilized_percent",
+    ]
+    assert list(utilization_data["node0_utilized_capacity"]) == [0, 1, 2, 2]
+    assert utilization_data["node0_utilized_percent"][2] == pytest.approx(2 / 3)
+
+    utilization_data = sim.create_utilization_data(layout="long", dtype=np.float32)
+    assert len(utilization_data) == 2 * 4
+    assert list(utilization_data["node"]) == [0, 0, 0, 0, 1, 1, 1, 1]
+    assert utilization_data["utilized_percent"].dtype == np.float32
+
+
+def test_cost_breakdown():
+    # One node is started at minute 1 and as the minimum number of nodes it keeps
+    # running, so it bills for 119 minutes, while its pod only lives 5 minutes.
+    user_activity = [[0, 1, 1] + [0] * 117]
+    sim = Simulation(configurations=configurations, user_activity=user_activity)
+    sim.run()
+
+    cost = sim.cost_breakdown()
+    cost_per_hour = configurations["cost_per_month"] / 720
+    assert cost["nodes"]["starting_hours"][0] == pytest.approx(5 / 60)
+    assert cost["nodes"]["running_hours"][0] == pytest.approx(114 / 60)
+    assert cost["nodes"]["billed_hours"][0] == pytest.approx(119 / 60)
+    assert cost["nodes"]["billed_hours"][1] == 0
+    assert cost["total"] == pytest.approx(119 / 60 * cost_per_hour)
+    assert list(cost["hourly_cost"]) == pytest.approx(
+        [59 / 60 * cost_per_hour, cost_per_hour]
+    )
+    assert cost["daily_cost"][0] == pytest.approx(cost["total"])
+
+    # Billing by utilization only counts the minutes with a pod on the node.
+    cost = sim.cost_breakdown(billing="utilization")
+    assert cost["nodes"]["billed_hours"][0] == pytest.approx(5 / 60)
+    assert sim.calculate_cost() == "Total costs for one week $0.04."
@@ -0,0 +1,47 @@
+import pytest
+import numpy as np
+
+from ..simulator import Simulation
+from ..streaming import activity_chunks, run_stream
+from .common import configurations, user_activity
+
+
+@pytest.mark.parametrize(
+    "configurations",
+    [
+        configurations,
+        # Without time to look back at, chunks start without any history.
+        dict(
+            configurations, pod_inactivity_time=0, node_stop_time=0, node_start_time=0
+        ),
+    ],
+    ids=["history", "no-history"],
+)
+@pytest.mark.parametrize("chunk_minutes", [1, 7, 60, 1000])
+@pytest.mark.parametrize("engine", ["tick", "event"])
+def test_stream_matches_simulation(configurations, chunk_minutes, engine):
+    sim = Simulation(configurations, user_activity)
+    sim.run()
+    started = sim.node_states() != 0
+    utilization = sim.node_utilization()
+
+    results = run_stream(
+        configurations, activity_chunks(user_activity, chunk_minutes), engine=engine
+    )
+    assert list(results["stop"])[-1] == user_activity.shape[1]
+    for row in results.itertuples():
+        minutes = slice(row.start, row.stop)
+        assert row.node_hours == np.sum(started[:, minutes]) / 60
+        assert row.pod_hours == np.sum(utilization[:, minutes]) / 60
+        assert row.peak_nodes == np.max(np.sum(started[:, minutes], axis=0))
+    assert results["total_cost"].sum() == pytest.approx(sim.summary()["total_cost"])
+
+
+def test_stream_memory_mapped_activity(tmp_path):
+    path = str(tmp_path / "activity.npy")
+    np.save(path, user_activity.view(np.uint8))
+    activity = np.load(path, mmap_mode="r")
+
+    results = run_stream(configurations, activity_chunks(activity, 30))
+    assert list(results["chunk"]) == list(range(8))
+    assert list(results["start"]) == list(range(0, 240, 30))
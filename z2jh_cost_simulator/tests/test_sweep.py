@@ -0,0 +1,45 @@
+import pytest
+
+from ..simulator import Simulation
+from .. import sweep as sweep_module
+from ..sweep import configuration_grid, run_sweep, sweep
+from .common import configurations, user_activity
+
+
+def test_configuration_grid():
+    grid = configuration_grid(
+        configurations, max_nodes=[3, 5], pod_inactivity_time=[3, 10, 30]
+    )
+
+    assert len(grid) == 6
+    assert grid[0]["max_nodes"] == 3 and grid[0]["pod_inactivity_time"] == 3
+    assert grid[5]["max_nodes"] == 5 and grid[5]["pod_inactivity_time"] == 30
+    assert all(c["node_memory"] == 4.6 for c in grid)
+
+
+def test_run_sweep():
+    grid = configuration_grid(configurations, pod_inactivity_time=[3, 10, 30])
+
+    results = run_sweep(grid, user_activity, processes=2)
+    assert list(results["configuration"]) == [0, 1, 2]
+    assert list(results["pod_inactivity_time"]) == [3, 10, 30]
+
+    # The results are the ones of simulating each configuration on its own.
+    sim = Simulation(grid[1], user_activity)
+    sim.run()
+    assert results["total_cost"][1] == pytest.approx(sim.summary()["total_cost"])
+    assert results["peak_nodes"][1] == sim.summary()["peak_nodes"]
+
+
+def test_sweep_in_process():
+    grid = configuration_grid(configurations, max_nodes=[2, 4])
+
+    results = list(sweep(grid, user_activity, processes=1))
+    assert [result["configuration"] for result in results] == [0, 1]
+    assert results[0]["peak_nodes"] <= 1
+    # The activity isn't kept by the module after the sweep.
+    assert sweep_module._worker_user_activity is None
+
+
+def test_run_sweep_without_configurations():
+    assert len(run_sweep([], user_activity, processes=1)) == 0
@@ -0,0 +1,76 @@
+import pytest
+import numpy as np
+
+from ..timeline import Timeline
+
+
+def test_assign_rest_of_timeline():
+    timeline = Timeline(10)
+
+    timeline[3:] = 1
+    timeline[6:] = 2
+    timeline[4:] = timeline[4] + 1
+
+    assert list(timeline) == [0, 0, 0, 1, 2, 2, 2, 2, 2, 2]
+    # Only the minutes where the value changes are stored.
+    assert timeline.times == [0, 3, 4]
+
+
+def test_assign_range_and_minute():
+    timeline = Timeline(10, value="Stopped", dtype=object)
+
+    timeline[2:5] = "Starting"
+    timeline[5:] = "Running"
+    timeline[7] = "Stopping"
+
+    assert timeline[1] == "Stopped"
+    assert timeline[4] == "Starting"
+    assert timeline[6] == "Running"
+    assert timeline[7] == "Stopping"
+    assert timeline[-1] == "Running"
+
+
+def test_matches_per_minute_array():
+    # Random writes to a timeline and a per-minute array give the same result.
+    random_state = np.random.RandomState(0)
+    timeline = Timeline(50)
+    array = np.zeros(50)
+
+    for i in range(200):
+        start, stop = sorted(random_state.randint(0, 51, size=2))
+        value = random_state.randint(0, 3)
+        timeline[start:stop] = value
+        array[start:stop] = value
+
+        assert np.array_equal(timeline, array)
+        start, stop = sorted(random_state.randint(0, 51, size=2))
+        assert np.array_equal(timeline[start:stop], array[start:stop])
+
+
+def test_constant_since_and_next_change():
+    timeline = Timeline(10)
+    timeline[3:] = 1
+    timeline[6:] = 0
+
+    assert timeline.constant_since(2) == 0
+    assert timeline.constant_since(5) == 3
+    assert timeline.next_change(3) == 6
+    assert timeline.next_change(6) is None
+
+
+def test_minute_outside_of_timeline():
+    timeline = Timeline(3)
+
+    with pytest.raises(IndexError):
+        timeline[3]
+
+
+def test_window():
+    timeline = Timeline(10)
+    timeline[3:] = 1
+    timeline[6:] = 2
+
+    assert list(timeline.window(4, 4)) == [1, 1, 2, 2]
+    # Minutes past the end keep the last value.
+    assert list(timeline.window(8, 4)) == [2, 2, 2, 2]
+    assert list(timeline.window(10, 3)) == [2, 2, 2]
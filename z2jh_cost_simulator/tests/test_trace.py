@@ -0,0 +1,78 @@
+import pytest
+import numpy as np
+
+from ..simulator import Simulation
+from ..trace import import_sessions, open_trace, write_trace
+from .common import configurations
+
+user_activity = (np.random.RandomState(0).rand(5, 100) < 0.3).view(np.uint8)
+
+
+def test_write_and_open_trace(tmp_path):
+    path = str(tmp_path / "activity.trace")
+    write_trace(path, user_activity, start_time=1560000000)
+
+    trace = open_trace(path)
+    assert trace.shape == (5, 100)
+    assert trace.start_time == 1560000000
+    assert trace.resolution == 60
+    assert isinstance(trace.packed, np.memmap)
+    assert np.array_equal(trace.activity(), user_activity)
+    assert np.array_equal(trace.activity(13, 42), user_activity[:, 13:42])
+    chunks = list(trace.chunks(30))
+    assert [chunk.shape[1] for chunk in chunks] == [30, 30, 30, 10]
+    assert np.array_equal(np.concatenate(chunks, axis=1), user_activity)
+
+    sim = Simulation(configurations, trace.activity())
+    assert sim.user_activity.shape == (5, 100)
+
+
+def test_open_other_file(tmp_path):
+    path = str(tmp_path / "activity.npy")
+    np.save(path, user_activity)
+
+    with pytest.raises(ValueError):
+        open_trace(path)
+
+
+def test_import_sessions(tmp_path):
+    csv_path = tmp_path / "sessions.csv"
+    csv_path.write_text(
+        "user,start,end\n"
+        "bob,2019-06-01 10:02:00,2019-06-01 10:05:30\n"
+        "alice,2019-06-01 10:00:00,2019-06-01 10:02:00\n"
+        "bob,2019-06-01 10:04:00,2019-06-01 10:07:00\n"
+    )
+    path = str(tmp_path / "sessions.trace")
+
+    trace = import_sessions(str(csv_path), path)
+    assert trace.start_time == 1559383200
+    assert trace.activity().tolist() == [
+        [1, 1, 0, 0, 0, 0, 0],
+        [0, 0, 1, 1, 1, 1, 1],
+    ]
+
+    # A session ending before it starts is left out.
+    csv_path.write_text(
+        csv_path.read_text() + "bob,2019-06-01 10:06:00,2019-06-01 10:03:00\n"
+    )
+    trace = import_sessions(str(csv_path), str(tmp_path / "invalid.trace"))
+    assert trace.activity().tolist() == [
+        [1, 1, 0, 0, 0, 0, 0],
+        [0, 0, 1, 1, 1, 1, 1],
+    ]
+
+
+@pytest.mark.parametrize("shape", [(0, 10), (3, 0), (0, 0)])
+def test_empty_trace(tmp_path, shape):
+    path = str(tmp_path / "empty.trace")
+    trace = write_trace(path, np.zeros(shape, dtype=np.uint8))
+    assert trace.shape == shape
+    assert trace.activity().shape == shape
+
+
+def test_import_no_sessions(tmp_path):
+    csv_path = tmp_path / "sessions.csv"
+    csv_path.write_text("user,start,end\n")
+    trace = import_sessions(str(csv_path), str(tmp_path / "sessions.trace"))
+    assert trace.shape == (0, 0)
@@ -0,0 +1,150 @@
+import bisect
+import numpy as np
+
+
+class Timeline:
+    """
+    A value for every minute of the simulation, stored as the minutes where the
+    value changes instead of as a per-minute array.
+
+    The simulator always writes a value to a minute and the minutes after it,
+    which with a per-minute array means rewriting the rest of the week. Here it
+    only adds a change point. The timeline can be indexed and sliced like the
+    per-minute array it replaces, and is only expanded to one when asked for.
+    """
+
+    def __init__(self, length, value=0, dtype=float):
+        """
+        length - the number of minutes of the timeline.
+        value  - the initial value for every minute.
+        dtype  - the dtype of the per-minute array, see to_array.
+        """
+        self.length = length
+        self.dtype = dtype
+        # The minutes where the value changes, and the value from that minute.
+        # Consecutive values always differ.
+        self.times = [0]
+        self.values = [value]
+        self._array = None
+
+    @classmethod
+    def from_array(cls, array, dtype=float):
+        """Returns a timeline with the values of a per-minute array."""
+        array = np.asarray(array)
+        timeline = cls(len(array), dtype=dtype)
+        if len(array) > 0:
+            times = np.concatenate(([0], np.flatnonzero(array[1:] != array[:-1]) + 1))
+            timeline.times = times.tolist()
+            timeline.values = array[times].tolist()
+        return timeline
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return iter(self.to_array())
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.to_array()
+        if dtype is not None:
+            return array.astype(dtype)
+        return array.copy() if copy else array
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            if step != 1:
+                return self.to_array()[key]
+            if stop <= start:
+                return np.array([], dtype=self.dtype)
+            first = self._index(start)
+            last = bisect.bisect_left(self.times, stop, lo=first)
+            edges = np.clip(self.times[first:last] + [stop], start, stop)
+            return np.repeat(
+                np.array(self.values[first:last], dtype=self.dtype), np.diff(edges)
+            )
+        return self.values[self._index(self._minute(key))]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            if step != 1:
+                raise ValueError("Timelines can only be assigned contiguous minutes.")
+            self._assign(start, stop, value)
+        else:
+            minute = self._minute(key)
+            self._assign(minute, minute + 1, value)
+
+    def constant_since(self, time):
+        """Returns the first minute of the unchanged period that includes 'time'."""
+        return self.times[self._index(time)]
+
+    def next_change(self, time):
+        """Returns the first minute after 'time' where the value changes, or None."""
+        index = bisect.bisect_right(self.times, time)
+        if index == len(self.times):
+            return None
+        return self.times[index]
+
+    def copy(self):
+        """Returns a copy of the timeline, which can be changed independently."""
+        timeline = Timeline(self.length, dtype=self.dtype)
+        timeline.times = list(self.times)
+        timeline.values = list(self.values)
+        return timeline
+
+    def window(self, start, length):
+        """
+        Returns a new timeline of 'length' minutes with the values of this one
+        from minute 'start', which can be the end of this timeline. Minutes past
+        the end of this timeline keep its last value.
+        """
+        first = self._index(self._minute(min(start, self.length - 1)))
+        last = bisect.bisect_left(self.times, start + length, lo=first)
+        timeline = Timeline(length, dtype=self.dtype)
+        timeline.times = [max(time - start, 0) for time in self.times[first:last]]
+        timeline.values = self.values[first:last]
+        return timeline
+
+    def to_array(self):
+        """Returns the timeline as a read-only per-minute array."""
+        if self._array is None:
+            lengths = np.diff(self.times + [self.length])
+            self._array = np.repeat(np.array(self.values, dtype=self.dtype), lengths)
+            self._array.flags.writeable = False
+        return self._array
+
+    def _minute(self, time):
+        if time < 0:
+            time += self.length
+        if not 0 <= time < self.length:
+            raise IndexError("Minute {} is outside of the timeline.".format(time))
+        return time
+
+    def _index(self, time):
+        # The simulator mostly asks about the latest change point.
+        if time >= self.times[-1]:
+            return len(self.times) - 1
+        return bisect.bisect_right(self.times, time) - 1
+
+    def _assign(self, start, stop, value):
+        if start >= stop:
+            return
+        following = self[stop] if stop < self.length else None
+
+        # Replace the change points within [start, stop] while keeping
+        # consecutive values different.
+        first = bisect.bisect_left(self.times, start)
+        last = bisect.bisect_right(self.times, stop)
+        previous = self.values[first - 1] if first > 0 else None
+        times, values = [], []
+        if first == 0 or value != previous:
+            times.append(start)
+            values.append(value)
+            previous = value
+        if following is not None and following != previous:
+            times.append(stop)
+            values.append(following)
+        self.times[first:last] = times
+        self.values[first:last] = values
+        self._array = None
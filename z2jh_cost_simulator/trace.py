@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+from .activity import as_activity_matrix
+
+# A trace file starts with this header, followed by the activity of every user
+# as a row of bits, one per time step, packed with np.packbits.
+_MAGIC = b"Z2JHTRCE"
+_VERSION = 1
+_HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("resolution", "<u4"),
+        ("user_count", "<u8"),
+        ("length", "<u8"),
+        ("start_time", "<i8"),
+    ]
+)
+
+# The number of time steps of all users to build at a time when importing.
+_BLOCK_SIZE = 2**24
+
+
+class Trace:
+    """
+    A user activity trace stored in a file, see write_trace. The file is mapped
+    into memory instead of read, so opening a trace is instant regardless of its
+    size, and only the activity that is asked for is read and unpacked.
+
+    user_count - the number of users.
+    length     - the number of time steps of the activity of a user.
+    start_time - the time of the first time step, in seconds since the epoch.
+    resolution - the duration of a time step in seconds, 60 for the minutes of
+                 the simulator.
+    packed     - the memory-mapped (users x bytes) matrix of packed activity.
+    """
+
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=_HEADER, count=1)
+        if len(header) == 0 or header["magic"][0] != _MAGIC:
+            raise ValueError("{} is not a user activity trace.".format(path))
+        if header["version"][0] != _VERSION:
+            raise ValueError(
+                "Unsupported trace version: {}".format(header["version"][0])
+            )
+        self.path = path
+        self.resolution = int(header["resolution"][0])
+        self.user_count = int(header["user_count"][0])
+        self.length = int(header["length"][0])
+        self.start_time = int(header["start_time"][0])
+        self.packed = _map_activity(path, self.user_count, self.length, mode="r")
+
+    @property
+    def shape(self):
+        return (self.user_count, self.length)
+
+    def activity(self, start=0, stop=None):
+        """
+        Returns the activity of the users from time step 'start' to 'stop' as a
+        (users x time steps) uint8 matrix, which Simulation takes as it is.
+        """
+        if stop is None or stop > self.length:
+            stop = self.length
+        if start >= stop:
+            return np.zeros((self.user_count, 0), dtype=np.uint8)
+        packed = self.packed[:, start // 8 : _packed_length(stop)]
+        return np.unpackbits(packed, axis=1)[:, start % 8 : start % 8 + stop - start]
+
+    def chunks(self, chunk_length):
+        """
+        Yields the activity of the users in chunks of 'chunk_length' time steps,
+        which streaming.stream takes to simulate a long trace in bounded memory.
+        """
+        for start in range(0, self.length, chunk_length):
+            yield self.activity(start, start + chunk_length)
+
+
+def open_trace(path):
+    """Opens a user activity trace file, see Trace."""
+    return Trace(path)
+
+
+def write_trace(path, user_activity, start_time=0, resolution=60):
+    """
+    Writes a (users x time steps) user activity matrix to a trace file, with a
+    bit per time step.
+
+    start_time - the time of the first time step, in seconds since the epoch.
+    resolution - the duration of a time step in seconds.
+    """
+    user_activity = as_activity_matrix(user_activity)
+    user_count, length = user_activity.shape
+    packed = _create_trace(path, user_count, length, start_time, resolution)
+    packed[:] = np.packbits(user_activity, axis=1)
+    _flush(packed)
+    return open_trace(path)
+
+
+def import_sessions(
+    csv_path,
+    path,
+    start_time=None,
+    stop_time=None,
+    resolution=60,
+    columns=("user", "start", "end"),
+):
+    """
+    Writes a trace file from a CSV file with a row per session of a user, and
+    returns it opened. The columns are the user's name and the start and end of
+    the session, as timestamps or seconds since the epoch. A user is active in
+    every time step that a session overlaps.
+
+    The activity is built a block of users at a time from the sorted sessions,
+    instead of as one dense matrix.
+
+    start_time - the time of the first time step, by default the start of the
+                 first session.
+    stop_time  - the end of the trace, by default the end of the last session.
+    resolution - the duration of a time step in seconds.
+    columns    - the names of the user, session start and session end columns.
+    """
+    user_column, start_column, end_column = columns
+    sessions = pd.read_csv(csv_path, usecols=list(columns))
+    starts = _seconds(sessions[start_column])
+    ends = _seconds(sessions[end_column])
+    users, names = pd.factorize(sessions[user_column], sort=True)
+
+    if start_time is None:
+        start_time = int(starts.min()) // resolution * resolution if len(starts) else 0
+    if stop_time is None:
+        stop_time = int(ends.max()) if len(ends) else start_time
+    length = max(-(-(stop_time - start_time) // resolution), 0)
+
+    # The first and the (exclusive) last time step of every session.
+    first = np.clip((starts - start_time) // resolution, 0, length)
+    last = np.clip(-(-(ends - start_time) // resolution), 0, length)
+    # Sessions ending before they start cover no time steps, and their counts
+    # would cancel out those of other sessions of the user.
+    covering = last > first
+    users, first, last = users[covering], first[covering], last[covering]
+    order = np.argsort(users, kind="stable")
+    users, first, last = users[order], first[order], last[order]
+
+    packed = _create_trace(path, len(names), length, start_time, resolution)
+    block_users = max(_BLOCK_SIZE // max(length, 1), 1)
+    for block_start in range(0, len(names), block_users):
+        block_stop = min(block_start + block_users, len(names))
+        lo, hi = np.searchsorted(users, [block_start, block_stop])
+        rows = users[lo:hi] - block_start
+        # Count the sessions covering every time step from where they start
+        # and end, then mark the time steps covered by any.
+        changes = np.zeros((block_stop - block_start, length + 1), dtype=np.int32)
+        np.add.at(changes, (rows, first[lo:hi]), 1)
+        np.add.at(changes, (rows, last[lo:hi]), -1)
+        active = np.cumsum(changes[:, :length], axis=1) > 0
+        packed[block_start:block_stop] = np.packbits(active, axis=1)
+    _flush(packed)
+    return open_trace(path)
+
+
+def _packed_length(length):
+    return -(-length // 8)
+
+
+def _create_trace(path, user_count, length, start_time, resolution):
+    """Writes the header of a trace file and returns its writable activity."""
+    header = np.zeros(1, dtype=_HEADER)
+    header["magic"] = _MAGIC
+    header["version"] = _VERSION
+    header["resolution"] = resolution
+    header["user_count"] = user_count
+    header["length"] = length
+    header["start_time"] = start_time
+    with open(path, "wb") as f:
+        header.tofile(f)
+        f.truncate(_HEADER.itemsize + user_count * _packed_length(length))
+    return _map_activity(path, user_count, length, mode="r+")
+
+
+def _map_activity(path, user_count, length, mode):
+    shape = (user_count, _packed_length(length))
+    if shape[0] * shape[1] == 0:
+        # Empty files can't be memory-mapped.
+        return np.zeros(shape, dtype=np.uint8)
+    return np.memmap(
+        path, dtype=np.uint8, mode=mode, offset=_HEADER.itemsize, shape=shape
+    )
+
+
+def _flush(packed):
+    # The activity of an empty trace isn't memory-mapped, see _map_activity.
+    if isinstance(packed, np.memmap):
+        packed.flush()
+
+
+def _seconds(times):
+    """Returns timestamps, or numbers of seconds, as int64 seconds since the epoch."""
+    if pd.api.types.is_numeric_dtype(times):
+        return times.to_numpy(dtype=np.int64)
+    times = pd.to_datetime(times, utc=True)
+    epoch = pd.Timestamp(0, tz="UTC")
+    return ((times - epoch) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64)